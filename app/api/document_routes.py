@@ -141,7 +141,7 @@ async def extract_text(document_id: str):
         Extracted text
     """
     try:
-        extracted_text = document_processor.extract_text_from_document(document_id)
+        extracted_text = await document_processor.extract_text_from_document(document_id)
         
         return {"document_id": document_id, "text": extracted_text}
     except ValueError as e:
@@ -169,7 +169,7 @@ async def analyze_document(request: DocumentAnalysisRequest):
             raise HTTPException(status_code=404, detail=f"Document not found: {request.document_id}")
         
         # Extract text from the document
-        extracted_text = document_processor.extract_text_from_document(request.document_id)
+        extracted_text = await document_processor.extract_text_from_document(request.document_id)
         
         # Prepare the full prompt with the extracted text
         full_prompt = f"{request.prompt}\n\nDocument content:\n{extracted_text}"
@@ -231,7 +231,7 @@ async def chat_with_document(
             raise HTTPException(status_code=404, detail=f"Document not found: {document_id}")
         
         # Extract text from the document
-        extracted_text = document_processor.extract_text_from_document(document_id)
+        extracted_text = await document_processor.extract_text_from_document(document_id)
         
         # Prepare the system prompt
         default_system_prompt = f"""You are a document assistant. You are given a document to analyze and answer questions about.
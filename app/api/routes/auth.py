@@ -13,6 +13,7 @@ from app.services.auth_service import (
     create_access_token, 
     get_current_user,
     blacklist_token,
+    run_password_task,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     oauth2_scheme
 )
@@ -48,8 +49,8 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
             detail="Email already registered"
         )
     
-    # Create new user
-    hashed_password = User.get_password_hash(user_data.password)
+    # Create new user (bcrypt is CPU-bound, keep it off the event loop)
+    hashed_password = await run_password_task(User.get_password_hash, user_data.password)
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -89,7 +90,7 @@ async def login_for_access_token(
     Raises:
         HTTPException: If authentication fails
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await run_password_task(authenticate_user, db, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -1,17 +1,19 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, List
+import time
 from sqlalchemy.orm import Session
 from app.models.chat_models import (
     ChatMessage, ChatResponse, AdvancedChatMessage,
     FunctionCallingMessage, DocumentChatMessage,
     WebSearchChatMessage, WebSearchResponse,
     ComplexTaskRequest, ComplexTaskResponse,
-    ChatWithContextRequest, ChatHistory, UserContext
+    ChatWithContextRequest, ChatHistory, UserContext,
+    ChatBatchRequest, ChatBatchResponse
 )
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.models.user_models import User
-from app.services.llm_service import get_llm_response
+from app.services.llm_service import get_llm_response, get_llm_responses_batch, BATCH_MAX_CONCURRENCY
 
 router = APIRouter(tags=["chat"])
 
@@ -52,6 +54,58 @@ async def chat(
         processing_time=0.5
     )
 
+@router.post("/batch")
+async def batch_chat(
+    batch: ChatBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> ChatBatchResponse:
+    """Send several independent messages to the LLM and answer them concurrently."""
+    start_time = time.time()
+    
+    # Get all responses concurrently instead of one round trip at a time
+    llm_responses = await get_llm_responses_batch(
+        [
+            {
+                "prompt": message.prompt,
+                "model": message.model,
+                "system_prompt": message.system_prompt,
+                "temperature": message.temperature,
+                "max_tokens": message.max_tokens,
+                "conversation_history": message.conversation_history,
+                "show_thinking": message.show_thinking
+            }
+            for message in batch.messages
+        ],
+        max_concurrency=min(batch.max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    )
+    
+    # Save to chat history in a single commit
+    db.add_all([
+        ChatHistory(
+            user_id=current_user.id,
+            message=message.prompt,
+            response=llm_response["response"],
+            model=message.model,
+            tokens_used=llm_response.get("tokens_used")
+        )
+        for message, llm_response in zip(batch.messages, llm_responses)
+    ])
+    db.commit()
+    
+    return ChatBatchResponse(
+        responses=[
+            ChatResponse(
+                response=llm_response["response"],
+                thinking_process=llm_response.get("thinking_process"),
+                model=message.model or "deepseek-r1:1.5b",
+                status="error" if llm_response["response"].startswith("Error:") else "success"
+            )
+            for message, llm_response in zip(batch.messages, llm_responses)
+        ],
+        processing_time=time.time() - start_time
+    )
+
 @router.post("/context")
 async def contextual_chat(
     message: ChatWithContextRequest,
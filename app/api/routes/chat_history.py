@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -9,7 +10,8 @@ from app.models.user_models import User
 from app.models.chat_models import (
     ChatHistory, UserContext,
     ChatHistoryCreate, ChatHistoryResponse,
-    UserContextCreate, UserContextUpdate, UserContextResponse
+    UserContextCreate, UserContextUpdate, UserContextResponse,
+    UserContextListAdapter, ChatHistoryListAdapter
 )
 
 router = APIRouter()
@@ -26,16 +28,24 @@ async def get_chat_history(
     current_user: User = Depends(get_current_user)
 ):
     """Get user's chat history with optional filtering."""
-    query = db.query(ChatHistory).filter(ChatHistory.user_id == current_user.id)
+    stmt = select(ChatHistory).where(ChatHistory.user_id == current_user.id)
     
     if context_id:
-        query = query.filter(ChatHistory.context_id == context_id)
+        stmt = stmt.where(ChatHistory.context_id == context_id)
     if start_date:
-        query = query.filter(ChatHistory.created_at >= start_date)
+        stmt = stmt.where(ChatHistory.created_at >= start_date)
     if end_date:
-        query = query.filter(ChatHistory.created_at <= end_date)
+        stmt = stmt.where(ChatHistory.created_at <= end_date)
     
-    return query.order_by(ChatHistory.created_at.desc()).offset(skip).limit(limit).all()
+    stmt = stmt.order_by(ChatHistory.created_at.desc()).offset(skip).limit(limit)
+    
+    # limit caps the page at 100 rows, so the body is built in one piece and
+    # query errors still surface as a proper error response
+    rows = db.execute(stmt).scalars()
+    return Response(
+        content=ChatHistoryListAdapter.dump_json([ChatHistoryResponse.from_orm_fast(row) for row in rows]),
+        media_type="application/json"
+    )
 
 @router.delete("/chat-history/{chat_id}")
 async def delete_chat_history(
@@ -87,7 +97,11 @@ async def get_contexts(
     query = db.query(UserContext).filter(UserContext.user_id == current_user.id)
     if active_only:
         query = query.filter(UserContext.is_active == True)
-    return query.order_by(UserContext.created_at.desc()).offset(skip).limit(limit).all()
+    rows = query.order_by(UserContext.created_at.desc()).offset(skip).limit(limit).all()
+    return Response(
+        content=UserContextListAdapter.dump_json([UserContextResponse.from_orm_fast(row) for row in rows]),
+        media_type="application/json"
+    )
 
 @router.get("/contexts/{context_id}", response_model=UserContextResponse)
 async def get_context(
@@ -122,7 +136,7 @@ async def update_context(
     if not context:
         raise HTTPException(status_code=404, detail="Context not found")
     
-    for field, value in context_update.dict(exclude_unset=True).items():
+    for field, value in context_update.model_dump(exclude_unset=True).items():
         setattr(context, field, value)
     
     db.commit()
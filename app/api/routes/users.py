@@ -1,6 +1,6 @@
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -10,9 +10,11 @@ from app.models.user_models import (
     UserUpdate, 
     UserInDB, 
     UsageRecordResponse,
-    UsageSummary
+    UsageSummary,
+    UsageRecordListAdapter,
+    MICRO_USD_PER_USD
 )
-from app.services.auth_service import get_current_user
+from app.services.auth_service import get_current_user, run_password_task
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -59,7 +61,7 @@ async def update_user_profile(
         current_user.full_name = user_data.full_name
     
     if user_data.password is not None:
-        current_user.hashed_password = User.get_password_hash(user_data.password)
+        current_user.hashed_password = await run_password_task(User.get_password_hash, user_data.password)
     
     db.commit()
     db.refresh(current_user)
@@ -93,7 +95,12 @@ async def get_user_usage(
         UsageRecord.created_at.desc()
     ).offset(offset).limit(limit).all()
     
-    return usage_records
+    return Response(
+        content=UsageRecordListAdapter.dump_json(
+            [UsageRecordResponse.from_orm_fast(record) for record in usage_records]
+        ),
+        media_type="application/json"
+    )
 
 @router.get("/me/usage/summary", response_model=UsageSummary)
 async def get_user_usage_summary(
@@ -122,6 +129,11 @@ async def get_user_usage_summary(
         UsageRecord.user_id == current_user.id
     ).scalar() or 0
     
+    # Get total cost (summed as integer micro-USD in the database)
+    total_cost_micro_usd = db.query(func.sum(UsageRecord.cost_micro_usd)).filter(
+        UsageRecord.user_id == current_user.id
+    ).scalar() or 0
+    
     # Get models used
     models_used = [
         model[0] for model in db.query(UsageRecord.model).filter(
@@ -140,6 +152,7 @@ async def get_user_usage_summary(
     return {
         "total_requests": total_requests,
         "total_tokens": total_tokens,
+        "total_cost": total_cost_micro_usd / MICRO_USD_PER_USD,
         "models_used": models_used,
         "endpoints_used": endpoints_used
     } 
\ No newline at end of file
@@ -27,7 +27,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+# Sync so FastAPI runs the blocking database lookup in its threadpool
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     """Get the current user from the token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,7 +66,8 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-async def verify_api_key(api_key: str, db: Session = Depends(get_db)) -> APIKey:
+# Sync so FastAPI runs the blocking database lookup in its threadpool
+def verify_api_key(api_key: str, db: Session = Depends(get_db)) -> APIKey:
     """Verify an API key and update its last used timestamp."""
     api_key_record = db.query(APIKey).filter(
         APIKey.key == api_key,
@@ -1,11 +1,18 @@
 import os
-from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
+import functools
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional, List
-from datetime import timedelta
+
+@functools.cache
+def load_env() -> bool:
+    """Load the .env file once per process; later calls are free."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return True
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 class Settings(BaseSettings):
     """Application settings."""
@@ -21,11 +28,27 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
     
+    # LLM provider selection; these are plain fields so BaseSettings reads
+    # and validates them from the environment when Settings() is built
+    LLM_PROVIDER: str = "ollama"
+    REQUEST_TIMEOUT: float = 60.0
+    DEFAULT_PROMPT_TYPE: str = "general"
+    
     # Ollama settings
-    OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    DEFAULT_MODEL: str = os.getenv("DEFAULT_MODEL", "deepseek-r1:1.5b")
-    MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", 2048))
-    TEMPERATURE: float = float(os.getenv("TEMPERATURE", 0.7))
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    DEFAULT_MODEL: str = "deepseek-r1:1.5b"
+    MAX_TOKENS: int = 2048
+    TEMPERATURE: float = 0.7
+    
+    # OpenAI settings
+    OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    OPENAI_DEFAULT_MODEL: str = "gpt-4o"
+    
+    # Anthropic settings
+    ANTHROPIC_API_KEY: str = ""
+    ANTHROPIC_BASE_URL: str = "https://api.anthropic.com/v1"
+    ANTHROPIC_DEFAULT_MODEL: str = "claude-3-opus-20240229"
     
     # Web search settings
     SEARCH_API_KEY: Optional[str] = os.getenv("SEARCH_API_KEY", "")
@@ -35,8 +58,14 @@ class Settings(BaseSettings):
     SEARCH_TIMEOUT: int = int(os.getenv("SEARCH_TIMEOUT", 30))
     ENABLE_WEB_SCRAPING: bool = os.getenv("ENABLE_WEB_SCRAPING", "True").lower() == "true"
     
-    class Config:
-        case_sensitive = True
+    @field_validator("LLM_PROVIDER")
+    @classmethod
+    def _normalize_provider(cls, value: str) -> str:
+        """Provider names are matched case-insensitively."""
+        return value.lower()
+    
+    # Read once at startup; settings must not change under running requests
+    model_config = SettingsConfigDict(case_sensitive=True, frozen=True)
 
 # Create global settings object
 settings = Settings() 
\ No newline at end of file
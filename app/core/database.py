@@ -3,11 +3,11 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import redis
 import os
-from dotenv import load_dotenv
+from app.core.config import load_env
 import logging
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
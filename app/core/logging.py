@@ -1,10 +1,10 @@
 import logging
-import json
 import os
 import time
 from datetime import datetime
 from typing import Dict, Any, Optional
-from fastapi import Request, Response
+import orjson
+from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
@@ -76,7 +76,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         request_body = None
         if method in ["POST", "PUT"] and any(path in url for path in ["/api/chat", "/api/function"]):
             try:
-                request_body = await request.json()
+                request_body = orjson.loads(await request.body())
             except Exception as e:
                 logger.warning(f"Could not parse request body: {str(e)}")
         
@@ -162,7 +162,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             log_entry["request_body"] = sanitized_body
         
         # Log as JSON
-        request_logger.info(json.dumps(log_entry))
+        request_logger.info(orjson.dumps(log_entry, default=str).decode())
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger with the given name."""
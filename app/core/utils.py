@@ -1,5 +1,5 @@
 import re
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional
 
 def extract_code_blocks(text: str) -> List[Dict[str, str]]:
     """
@@ -45,6 +45,9 @@ def enhance_prompt(prompt: str, context: Optional[str] = None) -> str:
     enhanced_prompt = f"Context:\n{context}\n\nQuestion: {prompt}"
     return enhanced_prompt
 
+# Display labels for conversation roles; other roles are left out
+ROLE_LABELS = {"user": "User", "assistant": "Assistant", "system": "System"}
+
 def format_conversation_history(history: List[Dict[str, str]]) -> str:
     """
     Format conversation history for display.
@@ -55,19 +58,14 @@ def format_conversation_history(history: List[Dict[str, str]]) -> str:
     Returns:
         Formatted conversation history as a string
     """
-    formatted = ""
+    # Collect the lines and join once rather than growing a string per message
+    formatted = []
     for message in history:
-        role = message.get("role", "unknown")
-        content = message.get("content", "")
-        
-        if role == "user":
-            formatted += f"User: {content}\n\n"
-        elif role == "assistant":
-            formatted += f"Assistant: {content}\n\n"
-        elif role == "system":
-            formatted += f"System: {content}\n\n"
-    
-    return formatted.strip()
+        label = ROLE_LABELS.get(message.get("role", "unknown"))
+        if label:
+            formatted.append(f"{label}: {message.get('content', '')}\n\n")
+    
+    return "".join(formatted).strip()
 
 def clean_response(response: str, show_thinking: bool = False) -> Dict[str, Optional[str]]:
     """
@@ -8,12 +8,15 @@ from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 import os
 import json
+import functools
 import httpx
 import sys
 from typing import Dict, List, Any, Optional
 import inspect
 import re
 from pathlib import Path
+from pydantic import BaseModel
+from pydantic.dataclasses import is_pydantic_dataclass
 
 from app.api.routes.chat import router as chat_router
 from app.api.routes.health import router as health_router
@@ -1112,6 +1115,85 @@ print(response.json())
     }
 ]
 
+# Search index: every searchable entry is tokenized once at import, each unique
+# token gets an integer id, and postings map token ids to entry ids so a query
+# becomes a set intersection instead of a substring scan over every document.
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def _build_search_index():
+    """Build the token dictionary and postings."""
+    entries = []
+    texts = []
+    
+    for category, category_data in API_DOCS.items():
+        entries.append({
+            "type": "api_category",
+            "id": category,
+            "title": category_data["title"],
+            "description": category_data["description"],
+            "url": f"/docs/api/{category}"
+        })
+        texts.append(" ".join([category, category_data["title"], category_data["description"]]))
+        
+        for endpoint in category_data["endpoints"]:
+            entries.append({
+                "type": "api_endpoint",
+                "id": endpoint["path"],
+                "title": endpoint["summary"],
+                "description": endpoint["description"],
+                "url": f"/docs/api/{category}#{endpoint['path'].replace('/', '_')}"
+            })
+            texts.append(" ".join([endpoint["path"], endpoint["summary"], endpoint["description"]]))
+    
+    for tutorial in TUTORIALS:
+        entries.append({
+            "type": "tutorial",
+            "id": tutorial["id"],
+            "title": tutorial["title"],
+            "description": tutorial["description"],
+            "url": f"/docs/tutorials/{tutorial['id']}"
+        })
+        texts.append(" ".join([tutorial["id"], tutorial["title"], tutorial["description"], tutorial["content"]]))
+    
+    token_ids: Dict[str, int] = {}
+    postings: Dict[int, set] = {}
+    
+    for doc_id, text in enumerate(texts):
+        for token in set(_tokenize(text)):
+            token_id = token_ids.setdefault(token, len(token_ids))
+            postings.setdefault(token_id, set()).add(doc_id)
+    
+    return entries, token_ids, postings
+
+_SEARCH_ENTRIES, _SEARCH_TOKEN_IDS, _SEARCH_POSTINGS = _build_search_index()
+
+def _search_index(query: str) -> List[Dict[str, str]]:
+    """Return the entries containing every token of the query, in index order."""
+    query_ids = set()
+    for token in _tokenize(query):
+        token_id = _SEARCH_TOKEN_IDS.get(token)
+        if token_id is None:
+            # A token that never occurs in the docs cannot match anything
+            return []
+        query_ids.add(token_id)
+    
+    if not query_ids:
+        return []
+    
+    # Intersect starting from the rarest token to keep the working set small
+    posting_sets = sorted((_SEARCH_POSTINGS[token_id] for token_id in query_ids), key=len)
+    matches = set(posting_sets[0])
+    for posting in posting_sets[1:]:
+        matches &= posting
+        if not matches:
+            return []
+    
+    return [_SEARCH_ENTRIES[doc_id] for doc_id in sorted(matches)]
+
 # Documentation routes
 @docs_router.get("/docs", response_class=HTMLResponse)
 async def get_docs_home(request: Request):
@@ -1197,21 +1279,21 @@ async def execute_api_test(request: Request):
     except Exception as e:
         return {"error": str(e)}
 
-@docs_router.get("/docs/models", response_class=HTMLResponse)
-async def get_models_docs(request: Request):
-    """Get documentation for the data models."""
-    # Extract model information
+@functools.cache
+def _get_models_info() -> Dict[str, Dict[str, Any]]:
+    """Collect field information for the chat models once; the models never change at runtime."""
     models_info = {}
     for name, cls in inspect.getmembers(sys.modules["app.models.chat_models"], inspect.isclass):
-        if cls.__module__ == "app.models.chat_models" and issubclass(cls, BaseModel):
+        if cls.__module__ == "app.models.chat_models" and (issubclass(cls, BaseModel) or is_pydantic_dataclass(cls)):
             # Get model fields and their descriptions
             fields = []
-            for field_name, field in cls.__fields__.items():
+            model_fields = cls.model_fields if issubclass(cls, BaseModel) else cls.__pydantic_fields__
+            for field_name, field in model_fields.items():
                 field_info = {
                     "name": field_name,
-                    "type": str(field.type_),
-                    "required": field.required,
-                    "description": field.field_info.description
+                    "type": str(field.annotation),
+                    "required": field.is_required(),
+                    "description": field.description
                 }
                 fields.append(field_info)
             
@@ -1225,53 +1307,20 @@ async def get_models_docs(request: Request):
                 "fields": fields
             }
     
+    return models_info
+
+@docs_router.get("/docs/models", response_class=HTMLResponse)
+async def get_models_docs(request: Request):
+    """Get documentation for the data models."""
     return templates.TemplateResponse(
         "models_docs.html", 
-        {"request": request, "models_info": models_info}
+        {"request": request, "models_info": _get_models_info()}
     )
 
 @docs_router.get("/docs/search", response_class=HTMLResponse)
 async def search_docs(request: Request, query: str):
     """Search the documentation."""
-    # Implement a simple search across API docs and tutorials
-    results = []
-    
-    # Search in API docs
-    for category, category_data in API_DOCS.items():
-        if query.lower() in category.lower() or query.lower() in category_data["title"].lower() or query.lower() in category_data["description"].lower():
-            results.append({
-                "type": "api_category",
-                "id": category,
-                "title": category_data["title"],
-                "description": category_data["description"],
-                "url": f"/docs/api/{category}"
-            })
-        
-        for endpoint in category_data["endpoints"]:
-            if (query.lower() in endpoint["path"].lower() or 
-                query.lower() in endpoint["summary"].lower() or 
-                query.lower() in endpoint["description"].lower()):
-                results.append({
-                    "type": "api_endpoint",
-                    "id": endpoint["path"],
-                    "title": endpoint["summary"],
-                    "description": endpoint["description"],
-                    "url": f"/docs/api/{category}#{endpoint['path'].replace('/', '_')}"
-                })
-    
-    # Search in tutorials
-    for tutorial in TUTORIALS:
-        if (query.lower() in tutorial["id"].lower() or 
-            query.lower() in tutorial["title"].lower() or 
-            query.lower() in tutorial["description"].lower() or 
-            query.lower() in tutorial["content"].lower()):
-            results.append({
-                "type": "tutorial",
-                "id": tutorial["id"],
-                "title": tutorial["title"],
-                "description": tutorial["description"],
-                "url": f"/docs/tutorials/{tutorial['id']}"
-            })
+    results = _search_index(query)
     
     return templates.TemplateResponse(
         "search_results.html", 
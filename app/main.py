@@ -1,30 +1,32 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 import uvicorn
-import os
-from dotenv import load_dotenv
+from app.core.config import load_env
 
 # Import routers and setup function
 from app.api.routes import setup_routes
 from app.api.template_routes import template_router
+from app.services.prompt_templates import initialize_default_templates
 from app.api.document_routes import document_router
 from app.docs import docs_router
+from app.services.auth_service import flush_api_key_usage
+from app.services.llm_service import close_http_client
+from app.services.web_search import close_scrape_client
+from app.services.document_service import shutdown_pdf_pool
 
 # Import logging
 from app.core.logging import RequestLoggingMiddleware, logger
 
-# Import database
-from app.core.database import engine, Base
-
 # Load environment variables
-load_dotenv()
+load_env()
 
 # Create FastAPI app
 app = FastAPI(
     title="Surfer API",
     description="A FastAPI backend for a ChatGPT-like application with advanced web surfing capabilities",
     version="0.4.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -50,13 +52,18 @@ app.include_router(docs_router)  # Include the documentation router
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    """Log when the application starts."""
+    """Seed the default prompt templates and log when the application starts."""
+    initialize_default_templates()
     logger.info("Surfer API starting up")
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Log when the application shuts down."""
+    """Flush buffered API key usage, close pooled connections and worker pools, and log when the application shuts down."""
+    flush_api_key_usage()
+    await close_http_client()
+    await close_scrape_client()
+    shutdown_pdf_pool()
     logger.info("Surfer API shutting down")
 
 if __name__ == "__main__":
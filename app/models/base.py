@@ -0,0 +1,29 @@
+import functools
+from typing import Any, Tuple
+
+
+class FastORMMixin:
+    """Mixin for Pydantic models that are built from trusted SQLAlchemy rows."""
+
+    @classmethod
+    @functools.cache
+    def _orm_field_names(cls, orm_cls: type) -> Tuple[str, ...]:
+        """Names of this model's fields that the ORM class provides, computed once per pair."""
+        return tuple(name for name in cls.model_fields if hasattr(orm_cls, name))
+
+    @classmethod
+    def from_orm_fast(cls, obj: Any):
+        """
+        Build the model from a database row without running validation.
+        
+        Only use this for rows loaded from our own database, where the column
+        types already guarantee the field types. Anything coming from a client
+        must still go through model_validate.
+        
+        Args:
+            obj: SQLAlchemy model instance
+            
+        Returns:
+            Model instance populated from the row's attributes
+        """
+        return cls.model_construct(**{name: getattr(obj, name) for name in cls._orm_field_names(type(obj))})
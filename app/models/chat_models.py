@@ -1,11 +1,18 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from pydantic.dataclasses import dataclass
 from typing import Optional, List, Dict, Any
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
+from typing_extensions import TypedDict
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import datetime
+import os
 
 from app.core.database import Base
+from app.models.base import FastORMMixin
+
+# Largest batch accepted by POST /chat/batch; larger requests fail validation (422)
+BATCH_MAX_MESSAGES = int(os.getenv("BATCH_MAX_MESSAGES", "100"))
 
 class ChatHistory(Base):
     """SQLAlchemy model for chat history."""
@@ -20,6 +27,10 @@ class ChatHistory(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     context_id = Column(Integer, ForeignKey("user_contexts.id"), nullable=True)
     
+    __table_args__ = (
+        Index("ix_chat_user_created", "user_id", "created_at"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="chat_history")
     context = relationship("UserContext", back_populates="chat_history")
@@ -41,6 +52,11 @@ class UserContext(Base):
     user = relationship("User", back_populates="contexts")
     chat_history = relationship("ChatHistory", back_populates="context")
 
+class ConversationTurn(TypedDict):
+    """A single message in a conversation history."""
+    role: str
+    content: str
+
 class ChatMessage(BaseModel):
     """Model for incoming chat messages."""
     prompt: str = Field(..., description="The user's message")
@@ -51,7 +67,7 @@ class ChatMessage(BaseModel):
     )
     temperature: Optional[float] = Field(None, description="Temperature for response generation (0.0 to 1.0)")
     max_tokens: Optional[int] = Field(None, description="Maximum number of tokens to generate")
-    conversation_history: Optional[List[Dict[str, str]]] = Field(
+    conversation_history: Optional[List[ConversationTurn]] = Field(
         default=None, 
         description="Previous conversation messages in the format [{'role': 'user', 'content': 'message'}, ...]"
     )
@@ -90,6 +106,25 @@ class ChatResponse(BaseModel):
     template_id: Optional[str] = Field(None, description="ID of the prompt template used, if any")
     document_id: Optional[str] = Field(None, description="ID of the document used, if any")
 
+class ChatBatchRequest(BaseModel):
+    """Model for a batch of independent chat messages."""
+    messages: List[ChatMessage] = Field(
+        ...,
+        min_length=1,
+        max_length=BATCH_MAX_MESSAGES,
+        description="The chat messages to answer"
+    )
+    max_concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Maximum number of messages sent to the model at once"
+    )
+
+class ChatBatchResponse(BaseModel):
+    """Model for batch chat responses."""
+    responses: List[ChatResponse] = Field(..., description="Responses in the same order as the messages")
+    processing_time: Optional[float] = Field(None, description="Time taken to process the whole batch in seconds")
+
 class FunctionCallingMessage(ChatMessage):
     """Model for chat messages with function calling capabilities."""
     enable_function_calling: bool = Field(
@@ -154,14 +189,16 @@ class WebSearchResponse(ChatResponse):
         description="The search query used"
     )
 
-class VisualElement(BaseModel):
+@dataclass(slots=True, frozen=True)
+class VisualElement:
     """Visual element for travel itinerary."""
     type: str = Field(..., description="Type of visual element (image, map, chart)")
     description: str = Field(..., description="Description of what this visual shows")
     source: Optional[str] = Field(None, description="Source URL if applicable")
     map_url: Optional[str] = Field(None, description="URL for map image if type is map")
 
-class DetailedSection(BaseModel):
+@dataclass(slots=True, frozen=True)
+class DetailedSection:
     """Detailed section for travel itinerary."""
     title: str = Field(..., description="Section title")
     content: str = Field(..., description="Section content")
@@ -211,14 +248,13 @@ class ChatHistoryCreate(ChatHistoryBase):
     """Pydantic model for creating chat history entries."""
     user_id: int
 
-class ChatHistoryInDB(ChatHistoryBase):
+class ChatHistoryInDB(FastORMMixin, ChatHistoryBase):
     """Pydantic model for chat history in database."""
     id: int
     user_id: int
     created_at: datetime.datetime
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ChatHistoryResponse(ChatHistoryInDB):
     """Pydantic model for chat history response."""
@@ -241,7 +277,7 @@ class UserContextUpdate(BaseModel):
     context_data: Optional[Dict[str, Any]] = None
     is_active: Optional[bool] = None
 
-class UserContextInDB(UserContextBase):
+class UserContextInDB(FastORMMixin, UserContextBase):
     """Pydantic model for user context in database."""
     id: int
     user_id: int
@@ -249,13 +285,16 @@ class UserContextInDB(UserContextBase):
     created_at: datetime.datetime
     updated_at: Optional[datetime.datetime] = None
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserContextResponse(UserContextInDB):
     """Pydantic model for user context response."""
     pass
 
+# Built once so list endpoints don't rebuild the list serializer per request
+UserContextListAdapter = TypeAdapter(List[UserContextResponse])
+ChatHistoryListAdapter = TypeAdapter(List[ChatHistoryResponse])
+
 class ChatWithContextRequest(ChatMessage):
     """Model for chat messages with context."""
     context_id: Optional[int] = Field(None, description="ID of the context to use")
@@ -1,18 +1,36 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, Numeric, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Text, Float, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
-from pydantic import BaseModel, EmailStr, Field, validator, HttpUrl
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter, field_validator, HttpUrl
 from typing import Optional, List, Dict, Any
-import uuid
 import datetime
+import os
+import re
 from passlib.context import CryptContext
 import secrets
 import string
 
 from app.core.database import Base
+from app.models.base import FastORMMixin
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# JSON column stored as JSONB on PostgreSQL (binary, GIN-indexable) and as
+# generic JSON elsewhere (SQLite)
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
+# Costs are stored as integer micro-dollars so sums stay in int arithmetic
+MICRO_USD_PER_USD = 1_000_000
+
+# Password hashing context; the bcrypt cost is pinned explicitly so it can be
+# tuned per deployment instead of following passlib's default
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# Single-pass check for a strong password: digit, upper, lower and punctuation
+PASSWORD_STRENGTH_PATTERN = re.compile(
+    r"(?=.*\d)(?=.*[A-Z])(?=.*[a-z])(?=.*[" + re.escape(string.punctuation) + r"])",
+    re.DOTALL
+)
 
 # SQLAlchemy Models
 class User(Base):
@@ -32,7 +50,7 @@ class User(Base):
     website = Column(String)
     location = Column(String)
     phone = Column(String)
-    preferences = Column(JSON, default={})
+    preferences = Column(JSONVariant, default=dict)
     
     # Account status
     is_active = Column(Boolean, default=True)
@@ -43,7 +61,7 @@ class User(Base):
     # Usage limits and billing
     api_quota = Column(Integer, default=1000)  # Monthly API call limit
     tokens_used = Column(Integer, default=0)
-    total_cost = Column(Numeric(10, 2), default=0)  # Total cost in USD
+    total_cost_micro_usd = Column(BigInteger, default=0)  # Total cost in micro-USD
     billing_status = Column(String, default="free")  # free, premium, enterprise
     subscription_expires = Column(DateTime(timezone=True), nullable=True)
     
@@ -59,6 +77,15 @@ class User(Base):
     chat_history = relationship("ChatHistory", back_populates="user", cascade="all, delete-orphan")
     contexts = relationship("UserContext", back_populates="user", cascade="all, delete-orphan")
     
+    @property
+    def total_cost(self) -> float:
+        """Total cost in USD."""
+        return (self.total_cost_micro_usd or 0) / MICRO_USD_PER_USD
+    
+    @total_cost.setter
+    def total_cost(self, value: float) -> None:
+        self.total_cost_micro_usd = round(value * MICRO_USD_PER_USD)
+    
     def verify_password(self, plain_password):
         """Verify a plain password against the hashed password."""
         return pwd_context.verify(plain_password, self.hashed_password)
@@ -82,6 +109,10 @@ class APIKey(Base):
     expires_at = Column(DateTime(timezone=True), nullable=True)
     last_used_at = Column(DateTime(timezone=True), nullable=True)
     
+    __table_args__ = (
+        Index("ix_apikey_user_active", "user_id", "is_active"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="api_keys")
     usage_records = relationship("UsageRecord", back_populates="api_key", cascade="all, delete-orphan")
@@ -89,29 +120,44 @@ class APIKey(Base):
     @staticmethod
     def generate_key():
         """Generate a new API key."""
-        return f"sk-{uuid.uuid4().hex}"
+        return f"sk-{secrets.token_urlsafe(24)}"
 
 
 class UsageRecord(Base):
     """SQLAlchemy model for tracking API usage."""
     __tablename__ = "usage_records"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    api_key_id = Column(Integer, ForeignKey("api_keys.id"), nullable=True)
-    endpoint = Column(String, nullable=False)
-    tokens_used = Column(Integer, default=0)
-    cost = Column(Numeric(10, 4), default=0)  # Cost in USD
-    model = Column(String)
-    status = Column(String)
-    response_time = Column(Float)  # Response time in seconds
-    error_message = Column(Text)
-    request_metadata = Column(JSON, default={})  # Additional request metadata
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    api_key_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("api_keys.id"), nullable=True)
+    endpoint: Mapped[str] = mapped_column(String, nullable=False)
+    tokens_used: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    cost_micro_usd: Mapped[Optional[int]] = mapped_column(BigInteger, default=0)  # Cost in micro-USD
+    model: Mapped[Optional[str]] = mapped_column(String)
+    status: Mapped[Optional[str]] = mapped_column(String)
+    response_time: Mapped[Optional[float]] = mapped_column(Float)  # Response time in seconds
+    error_message: Mapped[Optional[str]] = mapped_column(Text)
+    request_metadata: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONVariant, default=dict)  # Additional request metadata
+    created_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_usage_user_created", "user_id", "created_at"),
+        Index("ix_usage_apikey_created", "api_key_id", "created_at"),
+        Index("ix_usage_metadata_gin", "request_metadata", postgresql_using="gin"),
+    )
     
     # Relationships
-    user = relationship("User", back_populates="usage_records")
-    api_key = relationship("APIKey", back_populates="usage_records")
+    user: Mapped["User"] = relationship(back_populates="usage_records")
+    api_key: Mapped[Optional["APIKey"]] = relationship(back_populates="usage_records")
+    
+    @property
+    def cost(self) -> float:
+        """Cost in USD."""
+        return (self.cost_micro_usd or 0) / MICRO_USD_PER_USD
+    
+    @cost.setter
+    def cost(self, value: float) -> None:
+        self.cost_micro_usd = round(value * MICRO_USD_PER_USD)
 
 
 # Pydantic Models for API
@@ -123,7 +169,7 @@ class UserProfile(BaseModel):
     website: Optional[HttpUrl] = None
     location: Optional[str] = None
     phone: Optional[str] = None
-    preferences: Dict[str, Any] = {}
+    preferences: Dict[str, Any] = Field(default_factory=dict)
 
 
 class UserBase(BaseModel):
@@ -138,11 +184,15 @@ class UserCreate(UserBase):
     """Pydantic model for user creation."""
     password: str
     
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def password_strength(cls, v):
         """Validate password strength."""
         if len(v) < 8:
             raise ValueError('Password must be at least 8 characters long')
+        if PASSWORD_STRENGTH_PATTERN.match(v):
+            return v
+        # Slow path only to report which requirement is missing
         if not any(char.isdigit() for char in v):
             raise ValueError('Password must contain at least one digit')
         if not any(char.isupper() for char in v):
@@ -164,7 +214,7 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
-class UserInDB(UserBase):
+class UserInDB(FastORMMixin, UserBase):
     """Pydantic model for user in database."""
     id: int
     is_active: bool
@@ -180,8 +230,7 @@ class UserInDB(UserBase):
     last_login: Optional[datetime.datetime] = None
     last_active: Optional[datetime.datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserResponse(UserInDB):
@@ -213,7 +262,7 @@ class APIKeyCreate(APIKeyBase):
     pass
 
 
-class APIKeyInDB(APIKeyBase):
+class APIKeyInDB(FastORMMixin, APIKeyBase):
     """Pydantic model for API key in database."""
     id: int
     key: str
@@ -223,8 +272,7 @@ class APIKeyInDB(APIKeyBase):
     expires_at: Optional[datetime.datetime] = None
     last_used_at: Optional[datetime.datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class APIKeyResponse(APIKeyBase):
@@ -236,8 +284,7 @@ class APIKeyResponse(APIKeyBase):
     expires_at: Optional[datetime.datetime] = None
     last_used_at: Optional[datetime.datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UsageRecordBase(BaseModel):
@@ -249,7 +296,7 @@ class UsageRecordBase(BaseModel):
     status: Optional[str] = None
     response_time: Optional[float] = None
     error_message: Optional[str] = None
-    request_metadata: Dict[str, Any] = {}
+    request_metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
 class UsageRecordCreate(UsageRecordBase):
@@ -258,15 +305,14 @@ class UsageRecordCreate(UsageRecordBase):
     api_key_id: Optional[int] = None
 
 
-class UsageRecordInDB(UsageRecordBase):
+class UsageRecordInDB(FastORMMixin, UsageRecordBase):
     """Pydantic model for usage record in database."""
     id: int
     user_id: int
     api_key_id: Optional[int] = None
     created_at: datetime.datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UsageRecordResponse(UsageRecordInDB):
@@ -274,6 +320,10 @@ class UsageRecordResponse(UsageRecordInDB):
     pass
 
 
+# Built once so list endpoints don't rebuild the list serializer per request
+UsageRecordListAdapter = TypeAdapter(List[UsageRecordResponse])
+
+
 class UsageSummary(BaseModel):
     """Pydantic model for usage summary."""
     total_requests: int
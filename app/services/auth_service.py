@@ -1,28 +1,71 @@
 from datetime import datetime, timedelta
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Dict, Any
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, APIKeyHeader
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from cachetools import TTLCache
+import anyio
+import hashlib
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from app.core.config import load_env
 
-from app.core.database import get_db, get_redis
+from app.core.database import SessionLocal, get_db, get_redis
 from app.models.user_models import User, APIKey, TokenData
 import redis
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 # JWT Configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+# Verified tokens are cached briefly so repeat requests skip jwt.decode;
+# the blacklist is still checked on every request
+JWT_CACHE_TTL_SECONDS = int(os.getenv("JWT_CACHE_TTL_SECONDS", "5"))
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+_jwt_cache = TTLCache(maxsize=JWT_CACHE_SIZE, ttl=JWT_CACHE_TTL_SECONDS)
+_jwt_cache_lock = threading.Lock()
+
+# API keys resolve through a process-local cache before Redis, and their
+# last_used_at updates are buffered and written in batches
+API_KEY_CACHE_TTL_SECONDS = int(os.getenv("API_KEY_CACHE_TTL_SECONDS", "300"))
+API_KEY_CACHE_SIZE = int(os.getenv("API_KEY_CACHE_SIZE", "5000"))
+API_KEY_USAGE_FLUSH_SECONDS = float(os.getenv("API_KEY_USAGE_FLUSH_SECONDS", "1"))
+_api_key_cache = TTLCache(maxsize=API_KEY_CACHE_SIZE, ttl=API_KEY_CACHE_TTL_SECONDS)
+_api_key_cache_lock = threading.Lock()
+_pending_api_key_usage: Dict[int, datetime] = {}
+_api_key_usage_lock = threading.Lock()
+_last_api_key_usage_flush = 0.0
+
+# bcrypt releases the GIL, so worker threads hash in parallel; a dedicated
+# limiter keeps hashing bursts from starving the shared threadpool
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+password_hash_limiter = anyio.CapacityLimiter(PASSWORD_HASH_WORKERS)
+
 # Security schemes
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 api_key_header = APIKeyHeader(name="X-API-Key")
 
+def _secret_digest(secret: str) -> str:
+    """
+    Hash a token or API key for use in a Redis key.
+    
+    Keeps raw credentials out of Redis and gives every key a fixed length.
+    
+    Args:
+        secret: Token or API key
+        
+    Returns:
+        Hex SHA-256 digest of the secret
+    """
+    return hashlib.sha256(secret.encode()).hexdigest()
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -46,7 +89,10 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     
     return encoded_jwt
 
-async def get_current_user(
+# Auth dependencies that touch the database or Redis are plain functions:
+# FastAPI runs sync dependencies in its threadpool, keeping those blocking
+# calls off the event loop
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
     redis_client: redis.Redis = Depends(get_redis)
@@ -71,22 +117,35 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    token_digest = _secret_digest(token)
+    
     # Check if token is in blacklist
-    if redis_client.exists(f"blacklist:{token}"):
+    if redis_client.exists(f"blacklist:{token_digest}"):
         raise credentials_exception
     
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: Optional[int] = payload.get("sub")
-        
-        if user_id is None:
+    # Reuse a recent verification of the same token if there is one
+    with _jwt_cache_lock:
+        cached = _jwt_cache.get(token_digest)
+    
+    if cached and cached[1] > time.time():
+        user_id = cached[0]
+    else:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            user_id = payload.get("sub")
+            
+            if user_id is None:
+                raise credentials_exception
+            
+            token_data = TokenData(user_id=int(user_id), exp=datetime.fromtimestamp(payload.get("exp")))
+        except JWTError:
             raise credentials_exception
         
-        token_data = TokenData(user_id=int(user_id), exp=datetime.fromtimestamp(payload.get("exp")))
-    except JWTError:
-        raise credentials_exception
+        user_id = token_data.user_id
+        with _jwt_cache_lock:
+            _jwt_cache[token_digest] = (user_id, payload.get("exp"))
     
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    user = db.query(User).filter(User.id == user_id).first()
     
     if user is None or not user.is_active:
         raise credentials_exception
@@ -110,7 +169,46 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-async def get_api_key_user(
+def _record_api_key_usage(api_key_id: int, background_tasks: BackgroundTasks) -> None:
+    """
+    Buffer a last_used_at update, scheduling a flush at most once per interval.
+    
+    Args:
+        api_key_id: API key ID
+        background_tasks: Background tasks of the current request
+    """
+    global _last_api_key_usage_flush
+    
+    with _api_key_usage_lock:
+        _pending_api_key_usage[api_key_id] = datetime.utcnow()
+        
+        now = time.monotonic()
+        if now - _last_api_key_usage_flush < API_KEY_USAGE_FLUSH_SECONDS:
+            return
+        _last_api_key_usage_flush = now
+    
+    background_tasks.add_task(flush_api_key_usage)
+
+def flush_api_key_usage() -> None:
+    """Write all buffered API key last_used_at timestamps in one batch."""
+    with _api_key_usage_lock:
+        if not _pending_api_key_usage:
+            return
+        rows = [
+            {"id": api_key_id, "last_used_at": last_used_at}
+            for api_key_id, last_used_at in _pending_api_key_usage.items()
+        ]
+        _pending_api_key_usage.clear()
+    
+    db = SessionLocal()
+    try:
+        db.execute(update(APIKey), rows)
+        db.commit()
+    finally:
+        db.close()
+
+def get_api_key_user(
+    background_tasks: BackgroundTasks,
     api_key: str = Depends(api_key_header),
     db: Session = Depends(get_db),
     redis_client: redis.Redis = Depends(get_redis)
@@ -119,6 +217,7 @@ async def get_api_key_user(
     Get the user associated with an API key.
     
     Args:
+        background_tasks: Background tasks used to flush last_used_at updates
         api_key: API key
         db: Database session
         redis_client: Redis client
@@ -129,18 +228,32 @@ async def get_api_key_user(
     Raises:
         HTTPException: If API key is invalid or user not found
     """
-    # Check if API key is cached in Redis
-    cached_user_id = redis_client.get(f"api_key:{api_key}")
+    key_digest = _secret_digest(api_key)
+    
+    # Check the process-local cache, then Redis
+    with _api_key_cache_lock:
+        cached = _api_key_cache.get(key_digest)
+    
+    if cached is None:
+        cached_value = redis_client.get(f"api_key:{key_digest}")
+        parts = cached_value.split(":", 2) if cached_value else []
+        if len(parts) == 3:
+            user_id, api_key_id, expires_at = parts
+            cached = (
+                int(user_id),
+                int(api_key_id),
+                datetime.fromisoformat(expires_at) if expires_at else None
+            )
     
-    if cached_user_id:
-        user = db.query(User).filter(User.id == int(cached_user_id)).first()
-        if user and user.is_active:
-            # Update last used timestamp in database (async)
-            api_key_obj = db.query(APIKey).filter(APIKey.key == api_key).first()
-            if api_key_obj:
-                api_key_obj.last_used_at = datetime.utcnow()
-                db.commit()
-            return user
+    if cached:
+        user_id, api_key_id, expires_at = cached
+        if not expires_at or expires_at >= datetime.utcnow():
+            user = db.query(User).filter(User.id == user_id).first()
+            if user and user.is_active:
+                with _api_key_cache_lock:
+                    _api_key_cache[key_digest] = cached
+                _record_api_key_usage(api_key_id, background_tasks)
+                return user
     
     # If not cached, query the database
     api_key_obj = db.query(APIKey).filter(APIKey.key == api_key, APIKey.is_active == True).first()
@@ -160,10 +273,6 @@ async def get_api_key_user(
             headers={"WWW-Authenticate": "APIKey"},
         )
     
-    # Update last used timestamp
-    api_key_obj.last_used_at = datetime.utcnow()
-    db.commit()
-    
     # Get the user
     user = db.query(User).filter(User.id == api_key_obj.user_id).first()
     
@@ -174,8 +283,15 @@ async def get_api_key_user(
             headers={"WWW-Authenticate": "APIKey"},
         )
     
-    # Cache the API key in Redis for 1 hour
-    redis_client.setex(f"api_key:{api_key}", 3600, str(user.id))
+    # Update last used timestamp
+    _record_api_key_usage(api_key_obj.id, background_tasks)
+    
+    # Cache the API key locally and in Redis for 1 hour
+    cached = (user.id, api_key_obj.id, api_key_obj.expires_at)
+    with _api_key_cache_lock:
+        _api_key_cache[key_digest] = cached
+    expires_at = api_key_obj.expires_at.isoformat() if api_key_obj.expires_at else ""
+    redis_client.setex(f"api_key:{key_digest}", 3600, f"{user.id}:{api_key_obj.id}:{expires_at}")
     
     return user
 
@@ -201,6 +317,19 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     
     return user
 
+async def run_password_task(func, *args):
+    """
+    Run a blocking bcrypt hash/verify call off the event loop.
+    
+    Args:
+        func: Callable doing the hashing work
+        *args: Positional arguments for func
+        
+    Returns:
+        Whatever func returns
+    """
+    return await anyio.to_thread.run_sync(func, *args, limiter=password_hash_limiter)
+
 def blacklist_token(token: str, redis_client: redis.Redis, expires_in: int = None) -> None:
     """
     Add a token to the blacklist.
@@ -210,6 +339,12 @@ def blacklist_token(token: str, redis_client: redis.Redis, expires_in: int = Non
         redis_client: Redis client
         expires_in: Expiration time in seconds
     """
+    token_digest = _secret_digest(token)
+    
+    # Drop any cached verification so the token is rejected immediately
+    with _jwt_cache_lock:
+        _jwt_cache.pop(token_digest, None)
+    
     try:
         # If expiration not provided, decode the token to get its expiration
         if expires_in is None:
@@ -218,13 +353,15 @@ def blacklist_token(token: str, redis_client: redis.Redis, expires_in: int = Non
             
             if exp:
                 # Calculate remaining time until expiration
-                expires_in = max(0, int(exp - datetime.utcnow().timestamp()))
+                expires_in = int(exp - time.time())
             else:
                 # Default to 24 hours if no expiration found
                 expires_in = 86400
-        
-        # Add token to blacklist with expiration
-        redis_client.setex(f"blacklist:{token}", expires_in, "1")
     except JWTError:
-        # If token is invalid, still blacklist it for 24 hours
-        redis_client.setex(f"blacklist:{token}", 86400, "1") 
\ No newline at end of file
+        # Invalid or already expired tokens can never authenticate, so there
+        # is nothing to store for them
+        return
+    
+    # Only live tokens need an entry, and only until they would expire anyway
+    if expires_in > 0:
+        redis_client.setex(f"blacklist:{token_digest}", expires_in, "1") 
\ No newline at end of file
@@ -1,13 +1,19 @@
 import os
 import io
 import base64
-from typing import Dict, List, Optional, Any, Union
+import asyncio
+import functools
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple, Union
 from PIL import Image
-import pytesseract
-import fitz  # PyMuPDF
-import numpy as np
 from fastapi import UploadFile
-import logging
+
+# PyMuPDF, OpenCV and the OCR bindings are imported where they are used so
+# that importing this module (and the app) does not pay for them up front
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
 
 # Set up logging
 from app.core.logging import get_logger
@@ -16,6 +22,468 @@ logger = get_logger("document_service")
 # Configure document storage
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "data/uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Configure thumbnails
+THUMBNAIL_SIZE = (200, 200)
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+
+# Configure OCR
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_POOL_SIZE = int(os.getenv("OCR_POOL_SIZE", str(os.cpu_count() or 1)))
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "true").lower() == "true"
+OCR_DILATE = os.getenv("OCR_DILATE", "false").lower() == "true"
+
+# Tesseract API handles are not thread-safe, so each one is checked out of
+# the pool by a single thread at a time; handles are created lazily
+_ocr_pool = queue.Queue()
+_ocr_pool_lock = threading.Lock()
+_ocr_pool_created = 0
+
+@functools.cache
+def _tesserocr():
+    """
+    Import tesserocr on first use.
+    
+    Returns:
+        The tesserocr module, or None if it is not installed
+    """
+    try:
+        import tesserocr
+    except ImportError:  # tesserocr needs libtesseract headers to build
+        return None
+    return tesserocr
+
+def _acquire_ocr_api():
+    """
+    Check out a Tesseract API handle, creating one if the pool is not full.
+    
+    Returns:
+        A tesserocr PyTessBaseAPI instance owned by the caller until released
+    """
+    global _ocr_pool_created
+    
+    try:
+        return _ocr_pool.get_nowait()
+    except queue.Empty:
+        pass
+    
+    with _ocr_pool_lock:
+        if _ocr_pool_created < OCR_POOL_SIZE:
+            tesserocr = _tesserocr()
+            api = tesserocr.PyTessBaseAPI(lang=OCR_LANG, psm=tesserocr.PSM.AUTO)
+            _ocr_pool_created += 1
+            return api
+    
+    # Pool is full, wait for another thread to release a handle
+    return _ocr_pool.get()
+
+def _preprocess_for_ocr(image: Image.Image) -> Image.Image:
+    """
+    Binarize an image so Tesseract works on a clean bitmap.
+    
+    Args:
+        image: The original PIL image
+        
+    Returns:
+        A grayscale, adaptively thresholded copy of the image
+    """
+    import cv2
+    import numpy as np
+    
+    gray = cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2GRAY)
+    thresh = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+    )
+    
+    if OCR_DILATE:
+        thresh = cv2.dilate(thresh, np.ones((2, 2), np.uint8))
+    
+    return Image.fromarray(thresh)
+
+def _ocr_one(image: Image.Image, api) -> str:
+    """
+    Run OCR on one image with the given Tesseract handle.
+    
+    Args:
+        image: The PIL image to read
+        api: A pooled tesserocr handle, or None to use pytesseract
+        
+    Returns:
+        Extracted text
+    """
+    if OCR_PREPROCESS:
+        image = _preprocess_for_ocr(image)
+    
+    if api is None:
+        import pytesseract
+        return pytesseract.image_to_string(image, lang=OCR_LANG)
+    
+    api.SetImage(image)
+    return api.GetUTF8Text()
+
+def _ocr_images(images: List[Image.Image]) -> List[Union[str, Exception]]:
+    """
+    Run OCR on a batch of images, reusing one initialized Tesseract engine.
+    
+    Each image is read independently, so one unreadable image does not fail
+    the rest of the batch.
+    
+    Args:
+        images: The PIL images to read
+        
+    Returns:
+        Extracted text for each image, in order, or the exception it raised
+    """
+    api = _acquire_ocr_api() if _tesserocr() is not None else None
+    try:
+        results = []
+        for image in images:
+            try:
+                results.append(_ocr_one(image, api))
+            except Exception as e:
+                results.append(e)
+        return results
+    finally:
+        if api is not None:
+            _ocr_pool.put(api)
+
+# Uploads waiting for OCR are collected into batches by a background task;
+# each batch runs on one Tesseract handle in a worker thread
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "16"))
+OCR_BATCH_WAIT_SECONDS = float(os.getenv("OCR_BATCH_WAIT_SECONDS", "0.05"))
+
+_ocr_batch_queue: Optional[asyncio.Queue] = None
+_ocr_batch_collector: Optional[asyncio.Task] = None
+_ocr_batch_tasks = set()
+
+async def _run_ocr_batch(batch: List[Tuple[Image.Image, asyncio.Future]]) -> None:
+    """
+    OCR one batch in a worker thread and resolve its waiters.
+    
+    Args:
+        batch: (image, future) pairs
+    """
+    loop = asyncio.get_running_loop()
+    
+    try:
+        results = await loop.run_in_executor(None, _ocr_images, [image for image, _ in batch])
+    except Exception as e:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+        return
+    
+    # Only the waiter whose image failed sees its error
+    for (_, future), result in zip(batch, results):
+        if future.done():
+            continue
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+async def _collect_ocr_batches() -> None:
+    """Group queued images into batches of up to OCR_BATCH_SIZE."""
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        batch = [await _ocr_batch_queue.get()]
+        deadline = loop.time() + OCR_BATCH_WAIT_SECONDS
+        
+        # Wait briefly for more images to share the batch
+        while len(batch) < OCR_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_ocr_batch_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        # Run the batch without holding up collection of the next one
+        task = asyncio.create_task(_run_ocr_batch(batch))
+        _ocr_batch_tasks.add(task)
+        task.add_done_callback(_ocr_batch_tasks.discard)
+
+async def _ocr_image_batched(image: Image.Image) -> str:
+    """
+    Queue an image for batched OCR and wait for its text.
+    
+    Args:
+        image: The PIL image to read
+        
+    Returns:
+        Extracted text
+    """
+    global _ocr_batch_queue, _ocr_batch_collector
+    
+    if _ocr_batch_collector is None or _ocr_batch_collector.done():
+        _ocr_batch_queue = asyncio.Queue(maxsize=OCR_BATCH_SIZE * 4)
+        _ocr_batch_collector = asyncio.create_task(_collect_ocr_batches())
+    
+    future = asyncio.get_running_loop().create_future()
+    await _ocr_batch_queue.put((image, future))
+    return await future
+
+# Configure PDF page extraction
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "4"))
+
+# Extension an embedded image would be extracted as, by stream filter;
+# anything else is re-encoded as PNG by fitz
+IMAGE_FILTER_EXTENSIONS = {
+    "DCTDecode": "jpeg",
+    "JPXDecode": "jpx",
+    "JBIG2Decode": "jb2",
+    "CCITTFaxDecode": "tiff",
+}
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for PDF page extraction, creating it on first use."""
+    global _pdf_pool
+    
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pdf_pool
+
+def shutdown_pdf_pool() -> None:
+    """Shut down the PDF extraction process pool, if it was started."""
+    global _pdf_pool
+    
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+def _page_ranges(num_pages: int) -> List[Tuple[int, int]]:
+    """
+    Split a document's pages into one contiguous range per worker.
+    
+    Args:
+        num_pages: Number of pages in the document
+        
+    Returns:
+        List of (start, stop) page ranges; a single range for small documents
+    """
+    if num_pages < PDF_PARALLEL_MIN_PAGES or PDF_WORKERS < 2:
+        return [(0, num_pages)]
+    
+    chunk_size = -(-num_pages // PDF_WORKERS)
+    return [(start, min(start + chunk_size, num_pages)) for start in range(0, num_pages, chunk_size)]
+
+def _image_stream_size(pdf_document: "fitz.Document", xref: int) -> int:
+    """
+    Get the stored size of an embedded image without decoding it.
+    
+    Args:
+        pdf_document: The open PDF document
+        xref: The image's cross-reference number
+        
+    Returns:
+        Size of the image's raw stream in bytes
+    """
+    value_type, value = pdf_document.xref_get_key(xref, "Length")
+    if value_type == "int":
+        return int(value)
+    
+    # Length stored indirectly, read the raw (still compressed) stream
+    return len(pdf_document.xref_stream_raw(xref))
+
+def _extract_document_pages(
+    pdf_document: "fitz.Document", start: int, stop: int, include_images: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Extract text and image metadata from a range of pages of an open PDF.
+    
+    Args:
+        pdf_document: The open PDF document
+        start: First page index (inclusive)
+        stop: Last page index (exclusive)
+        include_images: Whether to collect embedded image metadata
+        
+    Returns:
+        List of page dictionaries in page order
+    """
+    pages = []
+    
+    for page_num in range(start, stop):
+        page = pdf_document[page_num]
+        page_text = page.get_text("text")
+        
+        # Only store metadata about the images, not the images themselves
+        page_images = []
+        if include_images:
+            for img_index, img_info in enumerate(page.get_images(full=True)):
+                xref = img_info[0]
+                page_images.append({
+                    "index": img_index,
+                    "extension": IMAGE_FILTER_EXTENSIONS.get(img_info[8], "png"),
+                    "size": _image_stream_size(pdf_document, xref)
+                })
+        
+        pages.append({
+            "page_number": page_num + 1,
+            "width": page.rect.width,
+            "height": page.rect.height,
+            "text": page_text,
+            "image_count": len(page_images),
+            "images": page_images
+        })
+    
+    return pages
+
+def _extract_pages(file_path: str, start: int, stop: int, include_images: bool = True) -> List[Dict[str, Any]]:
+    """
+    Extract text and image metadata from a range of pages of a stored PDF.
+    
+    Runs in worker processes, so it opens the document from disk rather than
+    receiving the PDF bytes.
+    
+    Args:
+        file_path: Path to the stored PDF
+        start: First page index (inclusive)
+        stop: Last page index (exclusive)
+        include_images: Whether to collect embedded image metadata
+        
+    Returns:
+        List of page dictionaries in page order
+    """
+    import fitz  # PyMuPDF
+    
+    pdf_document = fitz.open(file_path)
+    pages = _extract_document_pages(pdf_document, start, stop, include_images)
+    
+    # Close the document
+    pdf_document.close()
+    
+    return pages
+
+def _thumbnail_base64(image: Image.Image) -> str:
+    """
+    Render a base64-encoded JPEG thumbnail of an image.
+    
+    Args:
+        image: A freshly opened PIL image that has not been loaded yet;
+            resized in place
+        
+    Returns:
+        Base64-encoded JPEG thumbnail
+    """
+    # For JPEGs, let libjpeg decode at a reduced scale instead of decoding
+    # the full image and downsampling it; this only takes effect before the
+    # image data has been loaded
+    image.draft("RGB", THUMBNAIL_SIZE)
+    image.thumbnail(THUMBNAIL_SIZE)
+    
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    
+    thumbnail_buffer = io.BytesIO()
+    image.save(thumbnail_buffer, format="JPEG", quality=THUMBNAIL_QUALITY)
+    return base64.b64encode(thumbnail_buffer.getvalue()).decode("utf-8")
+
+def _page_thumbnail_base64(page: "fitz.Page") -> str:
+    """
+    Render a base64-encoded JPEG thumbnail of a PDF page.
+    
+    Args:
+        page: The PDF page
+        
+    Returns:
+        Base64-encoded JPEG thumbnail
+    """
+    import fitz  # PyMuPDF
+    
+    # Render straight to RGB without alpha so the JPEG encoder takes the
+    # samples as-is instead of converting them first
+    pix = page.get_pixmap(matrix=fitz.Matrix(0.2, 0.2), colorspace=fitz.csRGB, alpha=False)
+    thumbnail_bytes = pix.tobytes("jpeg", jpg_quality=THUMBNAIL_QUALITY)
+    return base64.b64encode(thumbnail_bytes).decode("utf-8")
+
+async def _save_upload(file: UploadFile) -> Tuple[str, str, int]:
+    """
+    Stream an upload to UPLOAD_DIR without holding it in memory.
+    
+    Args:
+        file: The uploaded file
+        
+    Returns:
+        Tuple of (stored filename, file path, file size in bytes)
+    """
+    filename = f"{os.urandom(8).hex()}_{file.filename}"
+    file_path = os.path.join(UPLOAD_DIR, filename)
+    file_size = 0
+    
+    with open(file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            f.write(chunk)
+            file_size += len(chunk)
+    
+    return filename, file_path, file_size
+
+def _read_pdf(
+    file_path: str, include_images: bool, thumbnail: bool
+) -> Tuple[int, Optional[str], Optional[List[Dict[str, Any]]]]:
+    """
+    Open a stored PDF, render its thumbnail and extract it if it is small.
+    
+    Blocking; run it in an executor.
+    
+    Args:
+        file_path: Path to the stored PDF
+        include_images: Whether to collect embedded image metadata
+        thumbnail: Whether to render a thumbnail of the first page
+        
+    Returns:
+        (number of pages, thumbnail or None, pages or None when the document
+        is large enough to be split across worker processes)
+    """
+    import fitz  # PyMuPDF
+    
+    pdf_document = fitz.open(file_path)
+    try:
+        num_pages = len(pdf_document)
+        thumbnail_base64 = _page_thumbnail_base64(pdf_document[0]) if thumbnail else None
+        
+        pages = None
+        if len(_page_ranges(num_pages)) == 1:
+            pages = _extract_document_pages(pdf_document, 0, num_pages, include_images)
+        return num_pages, thumbnail_base64, pages
+    finally:
+        pdf_document.close()
+
+async def _extract_pdf(
+    file_path: str, include_images: bool = True, thumbnail: bool = False
+) -> Tuple[int, Optional[str], List[Dict[str, Any]]]:
+    """
+    Extract a stored PDF without blocking the event loop.
+    
+    Small documents are read in a worker thread; larger ones have their page
+    ranges spread across the PDF process pool.
+    
+    Args:
+        file_path: Path to the stored PDF
+        include_images: Whether to collect embedded image metadata
+        thumbnail: Whether to render a thumbnail of the first page
+        
+    Returns:
+        (number of pages, thumbnail or None, pages in page order)
+    """
+    loop = asyncio.get_running_loop()
+    num_pages, thumbnail_base64, pages = await loop.run_in_executor(
+        None, _read_pdf, file_path, include_images, thumbnail
+    )
+    
+    if pages is None:
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(_get_pdf_pool(), _extract_pages, file_path, start, stop, include_images)
+            for start, stop in _page_ranges(num_pages)
+        ))
+        pages = [page for chunk in chunks for page in chunk]
+    
+    return num_pages, thumbnail_base64, pages
 
 class DocumentProcessor:
     """Service for processing various document types (images, PDFs)."""
@@ -32,38 +500,30 @@ class DocumentProcessor:
             Dictionary with extracted text and metadata
         """
         try:
-            # Read the file content
-            content = await file.read()
-            
             # Save the file
-            filename = f"{os.urandom(8).hex()}_{file.filename}"
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            
-            with open(file_path, "wb") as f:
-                f.write(content)
+            filename, file_path, file_size = await _save_upload(file)
             
             # Process the image
-            image = Image.open(io.BytesIO(content))
+            image = Image.open(file_path)
             
             # Extract text using OCR
-            extracted_text = pytesseract.image_to_string(image)
+            extracted_text = await _ocr_image_batched(image)
             
             # Get image metadata
             width, height = image.size
             format_type = image.format
             mode = image.mode
             
-            # Create a thumbnail
-            image.thumbnail((200, 200))
-            thumbnail_buffer = io.BytesIO()
-            image.save(thumbnail_buffer, format="JPEG")
-            thumbnail_base64 = base64.b64encode(thumbnail_buffer.getvalue()).decode("utf-8")
+            # Create the thumbnail from its own handle; OCR has already
+            # decoded this one at full size, which would defeat draft()
+            with Image.open(file_path) as thumbnail_image:
+                thumbnail_base64 = _thumbnail_base64(thumbnail_image)
             
             return {
                 "filename": file.filename,
                 "stored_filename": filename,
                 "file_path": file_path,
-                "file_size": len(content),
+                "file_size": file_size,
                 "width": width,
                 "height": height,
                 "format": format_type,
@@ -88,73 +548,19 @@ class DocumentProcessor:
             Dictionary with extracted text, metadata, and page information
         """
         try:
-            # Read the file content
-            content = await file.read()
-            
             # Save the file
-            filename = f"{os.urandom(8).hex()}_{file.filename}"
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            
-            with open(file_path, "wb") as f:
-                f.write(content)
+            filename, file_path, file_size = await _save_upload(file)
             
-            # Process the PDF
-            pdf_document = fitz.open(stream=content, filetype="pdf")
-            num_pages = len(pdf_document)
-            
-            # Extract text and images from each page
-            pages = []
-            all_text = []
-            
-            for page_num in range(num_pages):
-                page = pdf_document[page_num]
-                page_text = page.get_text()
-                all_text.append(page_text)
-                
-                # Get page dimensions
-                page_width = page.rect.width
-                page_height = page.rect.height
-                
-                # Create a thumbnail of the first page
-                if page_num == 0:
-                    pix = page.get_pixmap(matrix=fitz.Matrix(0.2, 0.2))
-                    thumbnail_bytes = pix.tobytes("jpeg")
-                    thumbnail_base64 = base64.b64encode(thumbnail_bytes).decode("utf-8")
-                
-                # Extract images from the page
-                page_images = []
-                image_list = page.get_images(full=True)
-                
-                for img_index, img_info in enumerate(image_list):
-                    xref = img_info[0]
-                    base_image = pdf_document.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    image_ext = base_image["ext"]
-                    
-                    # Only store metadata about the image, not the full image
-                    page_images.append({
-                        "index": img_index,
-                        "extension": image_ext,
-                        "size": len(image_bytes)
-                    })
-                
-                pages.append({
-                    "page_number": page_num + 1,
-                    "width": page_width,
-                    "height": page_height,
-                    "text": page_text,
-                    "image_count": len(page_images),
-                    "images": page_images
-                })
-            
-            # Close the document
-            pdf_document.close()
+            # Extract text and images from each page, plus a thumbnail of
+            # the first, off the event loop
+            num_pages, thumbnail_base64, pages = await _extract_pdf(file_path, thumbnail=True)
+            all_text = [page["text"] for page in pages]
             
             return {
                 "filename": file.filename,
                 "stored_filename": filename,
                 "file_path": file_path,
-                "file_size": len(content),
+                "file_size": file_size,
                 "num_pages": num_pages,
                 "pages": pages,
                 "extracted_text": "\n".join(all_text),
@@ -213,10 +619,7 @@ class DocumentProcessor:
                 mode = image.mode
                 
                 # Create a thumbnail
-                image.thumbnail((200, 200))
-                thumbnail_buffer = io.BytesIO()
-                image.save(thumbnail_buffer, format="JPEG")
-                thumbnail_base64 = base64.b64encode(thumbnail_buffer.getvalue()).decode("utf-8")
+                thumbnail_base64 = _thumbnail_base64(image)
                 
                 return {
                     "document_id": document_id,
@@ -230,14 +633,12 @@ class DocumentProcessor:
                 }
             elif document_id.lower().endswith(".pdf"):
                 # Process PDF
+                import fitz  # PyMuPDF
                 pdf_document = fitz.open(file_path)
                 num_pages = len(pdf_document)
                 
                 # Create a thumbnail of the first page
-                page = pdf_document[0]
-                pix = page.get_pixmap(matrix=fitz.Matrix(0.2, 0.2))
-                thumbnail_bytes = pix.tobytes("jpeg")
-                thumbnail_base64 = base64.b64encode(thumbnail_bytes).decode("utf-8")
+                thumbnail_base64 = _page_thumbnail_base64(pdf_document[0])
                 
                 # Close the document
                 pdf_document.close()
@@ -260,7 +661,7 @@ class DocumentProcessor:
             return None
     
     @staticmethod
-    def extract_text_from_document(document_id: str) -> str:
+    async def extract_text_from_document(document_id: str) -> str:
         """
         Extract text from a document.
         
@@ -280,19 +681,13 @@ class DocumentProcessor:
             if document_id.lower().endswith((".jpg", ".jpeg", ".png", ".gif", ".bmp")):
                 # Extract text from image using OCR
                 image = Image.open(file_path)
-                extracted_text = pytesseract.image_to_string(image)
+                extracted_text = await _ocr_image_batched(image)
                 return extracted_text
             elif document_id.lower().endswith(".pdf"):
                 # Extract text from PDF
-                pdf_document = fitz.open(file_path)
-                text = ""
+                _, _, pages = await _extract_pdf(file_path, include_images=False)
                 
-                for page_num in range(len(pdf_document)):
-                    page = pdf_document[page_num]
-                    text += page.get_text()
-                
-                # Close the document
-                pdf_document.close()
+                text = "".join(page["text"] for page in pages)
                 
                 return text
             else:
@@ -1,14 +1,88 @@
 from typing import Dict, List, Optional, Any, Callable
-import json
+import ast
+import functools
 import re
 import inspect
+import threading
 import logging
-from pydantic import BaseModel, Field, create_model
+import orjson
+from pydantic import BaseModel
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Function calls in the format: functionName(arg1="value1", arg2=123)
+FUNCTION_CALL_PATTERN = re.compile(r'(\w+)\((.*?)\)')
+# Keyword arguments, not splitting on commas inside quotes or brackets
+ARGUMENT_PAIR_PATTERN = re.compile(r'(\w+)\s*=\s*("[^"]*"|\'[^\']*\'|\{[^}]*\}|\[[^\]]*\]|[^,]+)')
+
+# JSON-schema-ish names for supported parameter annotations
+TYPE_NAMES = {
+    Any: "any",
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    List[str]: "array of strings",
+    List[int]: "array of integers",
+    Dict[str, Any]: "object",
+}
+
+# Bare words LLMs use for JSON/Python literals
+BARE_LITERALS = {"true": True, "false": False, "none": None, "null": None}
+
+def _literal_value(node: ast.expr) -> Any:
+    """
+    Convert a parsed argument value to a Python value.
+    
+    Args:
+        node: The argument's expression node
+        
+    Returns:
+        The literal value, or the source text for non-literal expressions
+    """
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError):
+        source = ast.unparse(node)
+        return BARE_LITERALS.get(source.lower(), source)
+
+def _make_caller(func: Callable, sig: inspect.Signature) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Build a caller that maps an arguments dict onto func's fixed signature.
+    
+    Args:
+        func: The registered function
+        sig: The function's signature
+        
+    Returns:
+        Callable taking the arguments dict and returning func's result
+    """
+    positional_kinds = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    params = [param for name, param in sig.parameters.items() if name != "self"]
+    
+    # *args, **kwargs and keyword-only parameters keep the generic path
+    if any(param.kind not in positional_kinds for param in params):
+        return lambda arguments: func(**arguments)
+    
+    func_name = getattr(func, "__name__", "function")
+    names = tuple(param.name for param in params)
+    known = frozenset(names)
+    defaults = {param.name: param.default for param in params if param.default is not inspect.Parameter.empty}
+    
+    def call(arguments: Dict[str, Any]) -> Any:
+        if not known.issuperset(arguments):
+            unexpected = ", ".join(sorted(set(arguments) - known))
+            raise TypeError(f"{func_name}() got unexpected keyword arguments: {unexpected}")
+        try:
+            values = [arguments[name] if name in arguments else defaults[name] for name in names]
+        except KeyError as e:
+            raise TypeError(f"{func_name}() missing required argument: {e.args[0]!r}") from None
+        return func(*values)
+    
+    return call
+
 class FunctionDefinition(BaseModel):
     """Model for function definitions."""
     name: str
@@ -27,6 +101,8 @@ class FunctionRegistry:
     def __init__(self):
         """Initialize the function registry."""
         self.functions: Dict[str, Dict[str, Any]] = {}
+        self._definitions_cache: Optional[List[Dict[str, Any]]] = None
+        self._definitions_lock = threading.Lock()
     
     def register(self, func: Callable, name: Optional[str] = None, description: Optional[str] = None):
         """
@@ -76,6 +152,7 @@ class FunctionRegistry:
         # Register the function
         self.functions[func_name] = {
             "function": func,
+            "caller": _make_caller(func, sig),
             "definition": FunctionDefinition(
                 name=func_name,
                 description=func_description,
@@ -84,45 +161,44 @@ class FunctionRegistry:
             )
         }
         
+        # Rebuild the definitions on next request
+        with self._definitions_lock:
+            self._definitions_cache = None
+        
         logger.info(f"Registered function: {func_name}")
         
         return func  # Return the function for use as a decorator
     
     def _get_type_name(self, type_hint: Any) -> str:
         """Get a string representation of a type hint."""
-        if type_hint == Any:
-            return "any"
-        elif type_hint == str:
-            return "string"
-        elif type_hint == int:
-            return "integer"
-        elif type_hint == float:
-            return "number"
-        elif type_hint == bool:
-            return "boolean"
-        elif type_hint == List[str]:
-            return "array of strings"
-        elif type_hint == List[int]:
-            return "array of integers"
-        elif type_hint == Dict[str, Any]:
-            return "object"
-        else:
+        try:
+            return TYPE_NAMES.get(type_hint, "any")
+        except TypeError:
+            # Unhashable annotation
             return "any"
     
     def get_function_definitions(self) -> List[Dict[str, Any]]:
-        """Get all function definitions in a format suitable for LLM API."""
-        return [
-            {
-                "name": func_data["definition"].name,
-                "description": func_data["definition"].description,
-                "parameters": {
-                    "type": "object",
-                    "properties": func_data["definition"].parameters,
-                    "required": func_data["definition"].required_parameters
-                }
-            }
-            for func_data in self.functions.values()
-        ]
+        """
+        Get all function definitions in a format suitable for LLM API.
+        
+        The list is built once per set of registered functions and shared
+        between callers, so it must not be modified.
+        """
+        with self._definitions_lock:
+            if self._definitions_cache is None:
+                self._definitions_cache = [
+                    {
+                        "name": func_data["definition"].name,
+                        "description": func_data["definition"].description,
+                        "parameters": {
+                            "type": "object",
+                            "properties": func_data["definition"].parameters,
+                            "required": func_data["definition"].required_parameters
+                        }
+                    }
+                    for func_data in self.functions.values()
+                ]
+            return self._definitions_cache
     
     def call_function(self, function_call: FunctionCall) -> Any:
         """
@@ -134,20 +210,75 @@ class FunctionRegistry:
         Returns:
             The result of the function call
         """
-        # Check if function exists
-        if function_call.name not in self.functions:
-            raise ValueError(f"Function {function_call.name} not found")
-        
         # Get function
-        func = self.functions[function_call.name]["function"]
+        func_data = self.functions.get(function_call.name)
+        if func_data is None:
+            raise ValueError(f"Function {function_call.name} not found")
         
         # Call function with arguments
         try:
-            return func(**function_call.arguments)
+            return func_data["caller"](function_call.arguments)
         except Exception as e:
             logger.error(f"Error calling function {function_call.name}: {str(e)}")
             raise
 
+    def _parse_arguments(self, args_str: str) -> Dict[str, Any]:
+        """
+        Parse keyword arguments using Python's own parser.
+        
+        Args:
+            args_str: The text between the call's parentheses
+            
+        Returns:
+            Dictionary of argument names to values
+        """
+        try:
+            call = ast.parse(f"__f__({args_str})", mode="eval").body
+        except (SyntaxError, ValueError):
+            # Not valid Python (e.g. unquoted strings with spaces)
+            return self._parse_arguments_loose(args_str)
+        
+        return {
+            keyword.arg: _literal_value(keyword.value)
+            for keyword in call.keywords
+            if keyword.arg is not None
+        }
+    
+    def _parse_arguments_loose(self, args_str: str) -> Dict[str, Any]:
+        """
+        Parse keyword arguments that are not valid Python syntax.
+        
+        Args:
+            args_str: The text between the call's parentheses
+            
+        Returns:
+            Dictionary of argument names to values
+        """
+        args = {}
+        
+        for arg_name, arg_value in ARGUMENT_PAIR_PATTERN.findall(args_str):
+            # Clean up the value
+            arg_value = arg_value.strip()
+            
+            # JSON covers numbers, true/false/null, double-quoted strings,
+            # arrays and objects in one call
+            try:
+                args[arg_name] = orjson.loads(arg_value)
+                continue
+            except orjson.JSONDecodeError:
+                pass
+            
+            # Handle single-quoted strings
+            if arg_value.startswith("'") and arg_value.endswith("'"):
+                arg_value = arg_value[1:-1]
+            # Handle Python-style booleans and None
+            elif arg_value.lower() in BARE_LITERALS:
+                arg_value = BARE_LITERALS[arg_value.lower()]
+            
+            args[arg_name] = arg_value
+        
+        return args
+
     def extract_function_calls(self, text: str) -> List[FunctionCall]:
         """
         Extract function calls from text.
@@ -160,11 +291,11 @@ class FunctionRegistry:
         """
         function_calls = []
         
-        # Look for function calls in the format: functionName(arg1="value1", arg2=123)
-        pattern = r'(\w+)\((.*?)\)'
-        matches = re.finditer(pattern, text)
+        # Skip the regex scan when no registered function is mentioned
+        if not any(f"{func_name}(" in text for func_name in self.functions):
+            return function_calls
         
-        for match in matches:
+        for match in FUNCTION_CALL_PATTERN.finditer(text):
             func_name = match.group(1)
             args_str = match.group(2)
             
@@ -173,43 +304,13 @@ class FunctionRegistry:
                 continue
             
             # Parse arguments
-            args = {}
-            if args_str:
-                # Split by commas, but not inside quotes or brackets
-                arg_pairs = re.findall(r'(\w+)\s*=\s*("[^"]*"|\'[^\']*\'|\{[^}]*\}|\[[^\]]*\]|[^,]+)', args_str)
-                for arg_name, arg_value in arg_pairs:
-                    # Clean up the value
-                    arg_value = arg_value.strip()
-                    
-                    # Handle strings
-                    if (arg_value.startswith('"') and arg_value.endswith('"')) or \
-                       (arg_value.startswith("'") and arg_value.endswith("'")):
-                        arg_value = arg_value[1:-1]
-                    # Handle numbers
-                    elif arg_value.isdigit():
-                        arg_value = int(arg_value)
-                    elif arg_value.replace('.', '', 1).isdigit():
-                        arg_value = float(arg_value)
-                    # Handle booleans
-                    elif arg_value.lower() == 'true':
-                        arg_value = True
-                    elif arg_value.lower() == 'false':
-                        arg_value = False
-                    # Handle null/None
-                    elif arg_value.lower() in ('none', 'null'):
-                        arg_value = None
-                    
-                    args[arg_name] = arg_value
+            args = self._parse_arguments(args_str) if args_str else {}
             
             function_calls.append(FunctionCall(name=func_name, arguments=args))
         
         return function_calls
 
-# Create a global function registry
-function_registry = FunctionRegistry()
-
 # Example functions to register
-@function_registry.register
 def get_weather(location: str, unit: str = "celsius") -> Dict[str, Any]:
     """
     Get the current weather for a location.
@@ -230,7 +331,6 @@ def get_weather(location: str, unit: str = "celsius") -> Dict[str, Any]:
         "humidity": 50
     }
 
-@function_registry.register
 def search_knowledge_base(query: str, max_results: int = 5) -> List[Dict[str, Any]]:
     """
     Search the knowledge base for information.
@@ -250,4 +350,18 @@ def search_knowledge_base(query: str, max_results: int = 5) -> List[Dict[str, An
             "relevance": 0.9 - (i * 0.1)
         }
         for i in range(min(max_results, 5))
-    ] 
\ No newline at end of file
+    ]
+
+@functools.cache
+def get_function_registry() -> FunctionRegistry:
+    """Create the global function registry, registering the examples on first use."""
+    registry = FunctionRegistry()
+    registry.register(get_weather)
+    registry.register(search_knowledge_base)
+    return registry
+
+def __getattr__(name: str) -> Any:
+    """Build `function_registry` lazily while keeping it importable by name."""
+    if name == "function_registry":
+        return get_function_registry()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,44 +1,348 @@
 import httpx
 import os
-import json
+import asyncio
+import random
+import orjson
 import time
-import re
-from typing import Optional, List, Dict, Any
-from dotenv import load_dotenv
+import functools
+from typing import Optional, List, Dict, AsyncGenerator, Callable, NamedTuple, Tuple
+from app.core.config import settings
 
-from app.core.utils import clean_response
-from app.services.prompt_engineering import create_system_prompt, create_chat_prompt
-
-# Load environment variables
-load_dotenv()
+from app.services.prompt_engineering import create_system_prompt
+from app.services.semantic_cache import SemanticCache
+from app.services.response_cache import ResponseCache
 
 # Provider selection
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama").lower()
+LLM_PROVIDER = settings.LLM_PROVIDER
+
+# Core settings, parsed once in app.core.config
+OLLAMA_BASE_URL = settings.OLLAMA_BASE_URL
+DEFAULT_MODEL = settings.DEFAULT_MODEL
+DEFAULT_TEMPERATURE = settings.TEMPERATURE
+DEFAULT_MAX_TOKENS = settings.MAX_TOKENS
+DEFAULT_TIMEOUT = settings.REQUEST_TIMEOUT
+DEFAULT_PROMPT_TYPE = settings.DEFAULT_PROMPT_TYPE
+
+# Timeouts for the connection phases a long read budget should not cover
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5.0"))
+HTTP_WRITE_TIMEOUT = float(os.getenv("HTTP_WRITE_TIMEOUT", "10.0"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5.0"))
+
+# Conversation history beyond this estimated token budget is compacted;
+# the middle is summarized by HISTORY_SUMMARY_MODEL if set, else dropped
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+HISTORY_KEEP_FIRST = int(os.getenv("HISTORY_KEEP_FIRST", "2"))
+HISTORY_SUMMARY_MODEL = os.getenv("HISTORY_SUMMARY_MODEL", "")
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "256"))
+
+# Upper bound on concurrent provider calls made for a single batch
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+
+# Transient provider failures are retried with full-jitter exponential
+# backoff, and each provider host gets a bounded number of calls in flight
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "3"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("RETRY_BACKOFF_SECONDS", "0.5"))
+RETRY_MAX_WAIT_SECONDS = float(os.getenv("RETRY_MAX_WAIT_SECONDS", "8"))
+PROVIDER_MAX_CONCURRENCY = int(os.getenv("PROVIDER_MAX_CONCURRENCY", "32"))
+# Only statuses that mean the request was not processed; a 500/502/504 may
+# come after the provider already ran (and billed) the generation
+RETRY_STATUS_CODES = frozenset({429, 503})
+
+# Errors raised before the request was sent to the provider
+RETRY_EXCEPTIONS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout
+)
 
-# Environment variables with defaults
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "deepseek-r1:1.5b")
-DEFAULT_TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
-DEFAULT_MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2048"))
-DEFAULT_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "60.0"))
-DEFAULT_PROMPT_TYPE = os.getenv("DEFAULT_PROMPT_TYPE", "general")
+# Fail fast on connect while still allowing long generations to be read
+REQUEST_TIMEOUT = httpx.Timeout(
+    connect=HTTP_CONNECT_TIMEOUT,
+    read=DEFAULT_TIMEOUT,
+    write=HTTP_WRITE_TIMEOUT,
+    pool=HTTP_POOL_TIMEOUT
+)
 
 # OpenAI Configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-OPENAI_DEFAULT_MODEL = os.getenv("OPENAI_DEFAULT_MODEL", "gpt-4o")
+OPENAI_API_KEY = settings.OPENAI_API_KEY
+OPENAI_BASE_URL = settings.OPENAI_BASE_URL
+OPENAI_DEFAULT_MODEL = settings.OPENAI_DEFAULT_MODEL
 
 # Anthropic Configuration
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
-ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com/v1")
-ANTHROPIC_DEFAULT_MODEL = os.getenv("ANTHROPIC_DEFAULT_MODEL", "claude-3-opus-20240229")
+ANTHROPIC_API_KEY = settings.ANTHROPIC_API_KEY
+ANTHROPIC_BASE_URL = settings.ANTHROPIC_BASE_URL
+ANTHROPIC_DEFAULT_MODEL = settings.ANTHROPIC_DEFAULT_MODEL
 
 # Add more provider configurations as needed
 
+# Streamed chunks are coalesced until this many arrive or this much time
+# passes, whichever comes first
+STREAM_FLUSH_CHUNKS = int(os.getenv("STREAM_FLUSH_CHUNKS", "32"))
+STREAM_FLUSH_SECONDS = float(os.getenv("STREAM_FLUSH_SECONDS", "0.05"))
+
+# Read size for streamed response bodies
+STREAM_READ_SIZE = int(os.getenv("STREAM_READ_SIZE", "8192"))
+
+# Reasoning models wrap their chain of thought in <think>...</think>
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+# httpx's json= encoder uses the stdlib; bodies are pre-encoded with orjson
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Compressed streams are buffered by the decoder, delaying each token
+STREAM_HEADERS = {**JSON_HEADERS, "Accept-Encoding": "identity"}
+
 # Logger setup
 import logging
 logger = logging.getLogger(__name__)
 
+# Shared HTTP client so provider calls reuse pooled keep-alive connections
+# (and HTTP/2 where the provider negotiates it) instead of reconnecting
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "40"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use."""
+    global _http_client
+    
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+    return _http_client
+
+# Optional semantic cache in front of Ollama: near-duplicate single-turn
+# prompts are answered from previous responses instead of the model
+ENABLE_SEMANTIC_CACHE = os.getenv("ENABLE_SEMANTIC_CACHE", "0").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_EMBED_MODEL = os.getenv("SEMANTIC_CACHE_EMBED_MODEL", "nomic-embed-text")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1000"))
+
+async def _ollama_embedding(text: str) -> List[float]:
+    """Embed a text with the Ollama embeddings endpoint."""
+    response = await _post_json(
+        f"{OLLAMA_BASE_URL}/api/embeddings",
+        {"model": SEMANTIC_CACHE_EMBED_MODEL, "prompt": text}
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)["embedding"]
+
+semantic_cache: Optional[SemanticCache] = (
+    SemanticCache(_ollama_embedding, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_SIZE)
+    if ENABLE_SEMANTIC_CACHE else None
+)
+
+# Exact-match response cache in front of every provider. Sampling at higher
+# temperatures is meant to vary, so those requests are not cached.
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+RESPONSE_CACHE_MAX_TEMPERATURE = float(os.getenv("RESPONSE_CACHE_MAX_TEMPERATURE", "0.3"))
+
+response_cache: Optional[ResponseCache] = (
+    ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+    if RESPONSE_CACHE_SIZE > 0 else None
+)
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _http_client
+    
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+_provider_limiters: Dict[str, asyncio.Semaphore] = {}
+
+def _provider_limiter(url: str) -> asyncio.Semaphore:
+    """Get the concurrency limiter for the host a URL points at."""
+    host = httpx.URL(url).host
+    limiter = _provider_limiters.get(host)
+    if limiter is None:
+        limiter = _provider_limiters[host] = asyncio.Semaphore(PROVIDER_MAX_CONCURRENCY)
+    return limiter
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """
+    Get how long to wait before the next attempt.
+    
+    Args:
+        attempt: The number of attempts made so far
+        response: The response that triggered the retry, if any
+        
+    Returns:
+        Seconds to wait, honouring a numeric Retry-After header
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), RETRY_MAX_WAIT_SECONDS)
+            except ValueError:
+                pass
+    return random.uniform(0, min(RETRY_MAX_WAIT_SECONDS, RETRY_BACKOFF_SECONDS * 2 ** attempt))
+
+async def _post_json(
+    url: str,
+    payload: Dict,
+    headers: Dict[str, str] = JSON_HEADERS
+) -> httpx.Response:
+    """
+    POST a JSON payload with the shared client.
+    
+    Connection failures before the request is sent and 429/503 statuses are
+    retried up to PROVIDER_MAX_RETRIES times with jittered backoff; read
+    timeouts and other errors are raised to the caller.
+    
+    Args:
+        url: The URL to post to
+        payload: The JSON payload
+        headers: Request headers
+        
+    Returns:
+        The response (the last one if retries ran out)
+    """
+    client = get_http_client()
+    limiter = _provider_limiter(url)
+    body = orjson.dumps(payload)
+    
+    for attempt in range(PROVIDER_MAX_RETRIES + 1):
+        last_attempt = attempt == PROVIDER_MAX_RETRIES
+        try:
+            async with limiter:
+                response = await client.post(url, content=body, headers=headers, timeout=REQUEST_TIMEOUT)
+        except RETRY_EXCEPTIONS as e:
+            if last_attempt:
+                raise
+            logger.warning("Retrying %s after %s: %s", url, type(e).__name__, e)
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        
+        if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+            return response
+        
+        logger.warning("Retrying %s after status %s", url, response.status_code)
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+def _extract_thinking(text: str) -> Optional[str]:
+    """
+    Get the contents of the first complete <think> block.
+    
+    Args:
+        text: The model's raw response
+        
+    Returns:
+        The thinking text, or None if there is no complete block
+    """
+    start = text.find(THINK_OPEN)
+    if start == -1:
+        return None
+    
+    start += len(THINK_OPEN)
+    end = text.find(THINK_CLOSE, start)
+    if end == -1:
+        return None
+    
+    return text[start:end]
+
+def _strip_thinking(text: str) -> Optional[str]:
+    """
+    Remove every complete <think> block from a response.
+    
+    Args:
+        text: The model's raw response
+        
+    Returns:
+        The response without thinking blocks, or None if it had none
+    """
+    parts = []
+    position = 0
+    
+    while True:
+        start = text.find(THINK_OPEN, position)
+        if start == -1:
+            break
+        end = text.find(THINK_CLOSE, start + len(THINK_OPEN))
+        if end == -1:
+            break
+        parts.append(text[position:start])
+        position = end + len(THINK_CLOSE)
+    
+    if not parts:
+        return None
+    
+    parts.append(text[position:])
+    return "".join(parts)
+
+class _ThinkingTracker:
+    """
+    Incrementally collect the text inside <think>...</think> blocks.
+    
+    Tags may be split across streamed chunks, so a trailing fragment that
+    could be the start of the next expected tag is carried over to the next
+    chunk instead of being classified immediately.
+    """
+    
+    def __init__(self):
+        self.in_thinking_block = False
+        self._parts: List[str] = []
+        self._carry = ""
+    
+    def feed(self, content: str) -> None:
+        """
+        Scan a chunk of the response.
+        
+        Args:
+            content: The next chunk of streamed text
+        """
+        text = self._carry + content if self._carry else content
+        self._carry = ""
+        position = 0
+        
+        while True:
+            tag = THINK_CLOSE if self.in_thinking_block else THINK_OPEN
+            index = text.find(tag, position)
+            
+            if index == -1:
+                # Hold back a possible partial tag at the end of the chunk
+                end = len(text)
+                partial = text.rfind("<", max(position, end - len(tag) + 1))
+                if partial != -1 and tag.startswith(text[partial:]):
+                    end = partial
+                    self._carry = text[partial:]
+                
+                if self.in_thinking_block and end > position:
+                    self._parts.append(text[position:end])
+                return
+            
+            if self.in_thinking_block:
+                self._parts.append(text[position:index])
+                self._parts.append("\n")
+            
+            position = index + len(tag)
+            self.in_thinking_block = not self.in_thinking_block
+    
+    def result(self) -> Optional[str]:
+        """
+        Get the collected thinking text.
+        
+        Returns:
+            The text of all thinking blocks seen so far, or None if there is none
+        """
+        parts = self._parts
+        if self.in_thinking_block and self._carry:
+            parts = parts + [self._carry]
+        thinking = "".join(parts).strip()
+        return thinking or None
+
 async def get_llm_response(
     prompt: str,
     model: str = DEFAULT_MODEL,
@@ -67,73 +371,256 @@ async def get_llm_response(
     Returns:
         Dictionary with 'response' and 'thinking_process' keys
     """
-    # Select the appropriate provider handler based on LLM_PROVIDER
-    if LLM_PROVIDER == "ollama":
-        return await _get_ollama_response(
-            prompt, model, system_prompt, temperature, max_tokens,
-            conversation_history, prompt_type, context, show_thinking
-        )
-    elif LLM_PROVIDER == "openai":
-        if not OPENAI_API_KEY:
-            logger.error("OpenAI API key not provided")
-            return {
-                "response": "Error: OpenAI API key not configured. Please set OPENAI_API_KEY in environment variables.",
-                "thinking_process": None
-            }
-        return await _get_openai_response(
-            prompt, model or OPENAI_DEFAULT_MODEL, system_prompt, temperature, max_tokens,
-            conversation_history, prompt_type, context, show_thinking
-        )
-    elif LLM_PROVIDER == "anthropic":
-        if not ANTHROPIC_API_KEY:
-            logger.error("Anthropic API key not provided")
-            return {
-                "response": "Error: Anthropic API key not configured. Please set ANTHROPIC_API_KEY in environment variables.",
-                "thinking_process": None
-            }
-        return await _get_anthropic_response(
-            prompt, model or ANTHROPIC_DEFAULT_MODEL, system_prompt, temperature, max_tokens,
-            conversation_history, prompt_type, context, show_thinking
+    # Replayed requests (retries, reloads, duplicate submits) hit the cache
+    cache_key = None
+    if (
+        response_cache is not None
+        and temperature is not None
+        and temperature <= RESPONSE_CACHE_MAX_TEMPERATURE
+    ):
+        cache_key = ResponseCache.make_key(
+            LLM_PROVIDER, model, system_prompt, temperature, max_tokens,
+            conversation_history, prompt_type, context, prompt, show_thinking
         )
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    # Keep long conversations within the history token budget
+    conversation_history = await _compact_history(conversation_history)
+    
+    result = await _dispatch_llm_response(
+        prompt, model, system_prompt, temperature, max_tokens,
+        conversation_history, prompt_type, context, show_thinking
+    )
+    
+    # Errors are reported as responses; never replay them
+    if cache_key is not None and not (result["response"] or "").startswith("Error:"):
+        response_cache.set(cache_key, result)
+    
+    return result
+
+def _estimate_tokens(message: Dict[str, str]) -> int:
+    """Roughly estimate the tokens a message costs (about four characters per token)."""
+    return len(message.get("content") or "") // 4 + 4
+
+async def _summarize_history(messages: List[Dict[str, str]]) -> Optional[str]:
+    """
+    Summarize a range of conversation messages with the summary model.
+    
+    Args:
+        messages: The messages to summarize
+        
+    Returns:
+        The summary, or None if summarization is disabled or failed
+    """
+    if not HISTORY_SUMMARY_MODEL:
+        return None
+    
+    # The same dropped range recurs on every later turn, so cache its summary
+    cache_key = ResponseCache.make_key("history-summary", LLM_PROVIDER, HISTORY_SUMMARY_MODEL, messages)
+    if response_cache is not None:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached["response"]
+    
+    transcript = "\n\n".join(f"{m.get('role', 'unknown')}: {m.get('content', '')}" for m in messages)
+    result = await _dispatch_llm_response(
+        transcript, HISTORY_SUMMARY_MODEL,
+        "Summarize the following conversation excerpt in a few sentences, keeping any facts, decisions and open questions.",
+        0.0, HISTORY_SUMMARY_MAX_TOKENS, None, DEFAULT_PROMPT_TYPE, None, False
+    )
+    summary = result["response"] or ""
+    if summary.startswith("Error:"):
+        return None
+    
+    stripped = _strip_thinking(summary)
+    summary = (stripped if stripped is not None else summary).strip()
+    if response_cache is not None and summary:
+        response_cache.set(cache_key, {"response": summary, "thinking_process": None})
+    return summary or None
+
+async def _compact_history(
+    conversation_history: Optional[List[Dict[str, str]]]
+) -> Optional[List[Dict[str, str]]]:
+    """
+    Fit a conversation history into HISTORY_TOKEN_BUDGET.
+    
+    The first HISTORY_KEEP_FIRST messages and as many recent messages as fit
+    are kept verbatim; the middle is replaced by a single system message,
+    summarized by HISTORY_SUMMARY_MODEL when one is configured.
+    
+    Args:
+        conversation_history: The previous conversation messages
+        
+    Returns:
+        The history, compacted if it was over budget
+    """
+    if not conversation_history or HISTORY_TOKEN_BUDGET <= 0:
+        return conversation_history
+    
+    costs = [_estimate_tokens(message) for message in conversation_history]
+    if sum(costs) <= HISTORY_TOKEN_BUDGET:
+        return conversation_history
+    
+    # Keep the opening messages, then fill the remaining budget from the end
+    keep_first = min(HISTORY_KEEP_FIRST, len(conversation_history))
+    remaining = HISTORY_TOKEN_BUDGET - sum(costs[:keep_first])
+    start = len(conversation_history)
+    while start > keep_first and costs[start - 1] <= remaining:
+        remaining -= costs[start - 1]
+        start -= 1
+    
+    dropped = conversation_history[keep_first:start]
+    if not dropped:
+        return conversation_history
+    
+    summary = await _summarize_history(dropped)
+    if summary:
+        note = f"Summary of earlier turns: {summary}"
     else:
+        note = f"[{len(dropped)} earlier messages omitted]"
+    
+    logger.debug("Compacted %d history messages", len(dropped))
+    return [
+        *conversation_history[:keep_first],
+        {"role": "system", "content": note},
+        *conversation_history[start:]
+    ]
+
+async def _dispatch_llm_response(
+    prompt: str,
+    model: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    max_tokens: int,
+    conversation_history: Optional[List[Dict[str, str]]],
+    prompt_type: str,
+    context: Optional[str],
+    show_thinking: bool
+) -> Dict[str, Optional[str]]:
+    """Send a request to the provider selected by LLM_PROVIDER."""
+    provider = _PROVIDERS.get(LLM_PROVIDER)
+    if provider is None:
         logger.error(f"Unsupported LLM provider: {LLM_PROVIDER}")
         return {
             "response": f"Error: Unsupported LLM provider: {LLM_PROVIDER}",
             "thinking_process": None
         }
+    
+    if provider.api_key_variable and not provider.api_key:
+        logger.error(f"{provider.label} API key not provided")
+        return {
+            "response": f"Error: {provider.label} API key not configured. Please set {provider.api_key_variable} in environment variables.",
+            "thinking_process": None
+        }
+    
+    return await provider.handler(
+        prompt, model or provider.default_model, system_prompt, temperature, max_tokens,
+        conversation_history, prompt_type, context, show_thinking
+    )
 
-async def _get_ollama_response(
-    prompt: str,
-    model: str = DEFAULT_MODEL,
-    system_prompt: Optional[str] = None,
-    temperature: float = DEFAULT_TEMPERATURE,
-    max_tokens: int = DEFAULT_MAX_TOKENS,
-    conversation_history: Optional[List[Dict[str, str]]] = None,
-    prompt_type: str = DEFAULT_PROMPT_TYPE,
-    context: Optional[str] = None,
-    show_thinking: bool = False
-) -> Dict[str, Optional[str]]:
-    """Implementation for Ollama provider."""
-    # Prepare the messages
-    messages = []
+async def get_llm_responses_batch(
+    requests: List[Dict],
+    max_concurrency: int = BATCH_MAX_CONCURRENCY
+) -> List[Dict[str, Optional[str]]]:
+    """
+    Get responses for several independent prompts concurrently.
     
-    # Use prompt engineering to create a system prompt if not provided
-    if not system_prompt:
-        system_prompt = create_system_prompt(prompt_type)
+    Args:
+        requests: Keyword arguments for get_llm_response, one dict per prompt
+        max_concurrency: Maximum number of requests in flight at once
+        
+    Returns:
+        The responses, in the same order as the requests
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def bounded(request: Dict) -> Dict[str, Optional[str]]:
+        async with semaphore:
+            return await get_llm_response(**request)
+    
+    return await asyncio.gather(*(bounded(request) for request in requests))
+
+@functools.lru_cache(maxsize=64)
+def _system_message(system_prompt: str) -> Dict[str, str]:
+    """Get the system message for a system prompt, built once per prompt."""
+    return {"role": "system", "content": system_prompt}
+
+def _build_messages(
+    system_prompt: str,
+    conversation_history: Optional[List[Dict[str, str]]],
+    context: Optional[str],
+    prompt: str
+) -> List[Dict[str, str]]:
+    """
+    Build a chat message list ordered from most to least stable.
     
-    # Add system prompt
-    messages.append({"role": "system", "content": system_prompt})
+    The system prompt and committed history come first and are left
+    untouched, so they form a byte-identical prefix across turns that
+    provider prompt caches can reuse; per-request context sits in its own
+    message just before the new user turn.
+    
+    Args:
+        system_prompt: The system prompt
+        conversation_history: Optional previous messages
+        context: Optional context for this request
+        prompt: The user's prompt
+        
+    Returns:
+        The messages to send
+    """
+    # Add system prompt (shared message object, never mutated)
+    messages = [_system_message(system_prompt)]
     
     # Add conversation history if provided
     if conversation_history:
         messages.extend(conversation_history)
     
-    # Use prompt engineering to enhance the user prompt if context is provided
+    # Add context as its own message so the prefix above stays stable
     if context:
-        enhanced_prompt = create_chat_prompt(prompt, conversation_history, context)
-        messages.append({"role": "user", "content": enhanced_prompt})
-    else:
-        messages.append({"role": "user", "content": prompt})
+        messages.append({"role": "system", "content": f"Context:\n{context}"})
+    
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+def _build_ollama_payload(
+    prompt: str,
+    model: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    max_tokens: int,
+    conversation_history: Optional[List[Dict[str, str]]],
+    prompt_type: str,
+    context: Optional[str],
+    *,
+    stream: bool
+) -> Dict:
+    """
+    Build the Ollama chat request payload.
+    
+    Shared by the streaming and non-streaming paths so they always send the
+    same messages.
+    
+    Args:
+        prompt: The user's prompt
+        model: The model to use
+        system_prompt: Optional system prompt; built from prompt_type if not provided
+        temperature: Sampling temperature
+        max_tokens: Maximum number of tokens to generate
+        conversation_history: Optional previous messages
+        prompt_type: Type of prompt to use if no system prompt is given
+        context: Optional context used to enhance the prompt
+        stream: Whether to request a streamed response
+        
+    Returns:
+        The request payload
+    """
+    # Use prompt engineering to create a system prompt if not provided
+    if not system_prompt:
+        system_prompt = create_system_prompt(prompt_type)
+    
+    messages = _build_messages(system_prompt, conversation_history, context, prompt)
     
     # Prepare the request payload
     payload = {
@@ -143,54 +630,96 @@ async def _get_ollama_response(
             "temperature": temperature,
             "num_predict": max_tokens
         },
-        "stream": False
+        "stream": stream
     }
     
+    return payload
+
+async def _get_ollama_response(
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    system_prompt: Optional[str] = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    prompt_type: str = DEFAULT_PROMPT_TYPE,
+    context: Optional[str] = None,
+    show_thinking: bool = False
+) -> Dict[str, Optional[str]]:
+    """Implementation for Ollama provider."""
+    # Prepare the request payload
+    payload = _build_ollama_payload(
+        prompt, model, system_prompt, temperature, max_tokens,
+        conversation_history, prompt_type, context, stream=False
+    )
+    system_prompt = payload["messages"][0]["content"]
+    
     # Log the system prompt instead of printing
-    logger.debug(f"System prompt: {system_prompt}")
+    logger.debug("System prompt: %s", system_prompt)
+    
+    # Only single-turn prompts are cached; history or context changes the answer
+    cache_scope = None
+    cache_vector = None
+    if semantic_cache is not None and not conversation_history and not context:
+        cache_scope = (model, system_prompt, temperature, max_tokens, show_thinking)
+        try:
+            cache_vector = await semantic_cache.embed(prompt)
+            cached = semantic_cache.lookup(cache_scope, cache_vector)
+            if cached is not None:
+                return dict(cached)
+        except Exception as e:
+            logger.warning("Semantic cache lookup failed: %s", e)
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/chat",
-                json=payload,
-                timeout=DEFAULT_TIMEOUT  # Use environment variable for timeout
-            )
+        response = await _post_json(f"{OLLAMA_BASE_URL}/api/chat", payload)
+        
+        if response.status_code != 200:
+            error_message = f"Error from Ollama API: {response.status_code} - {response.text}"
+            logger.error(error_message)
+            return {
+                "response": f"Error: {error_message}",
+                "thinking_process": None
+            }
+        
+        response_data = orjson.loads(response.content)
+        
+        # Extract the assistant's message
+        if "message" in response_data and "content" in response_data["message"]:
+            # Get the raw response
+            raw_response = response_data["message"]["content"]
             
-            if response.status_code != 200:
-                error_message = f"Error from Ollama API: {response.status_code} - {response.text}"
-                logger.error(error_message)
-                return {
-                    "response": f"Error: {error_message}",
-                    "thinking_process": None
-                }
+            # Log the raw response instead of printing
+            logger.debug("Raw response from model: %s", raw_response)
             
-            response_data = response.json()
+            # Extract thinking process if present
+            thinking_content = None
+            if show_thinking:
+                thinking = _extract_thinking(raw_response)
+                if thinking is not None:
+                    thinking_content = thinking.strip()
             
-            # Extract the assistant's message
-            if "message" in response_data and "content" in response_data["message"]:
-                # Get the raw response
-                raw_response = response_data["message"]["content"]
-                
-                # Log the raw response instead of printing
-                logger.debug(f"Raw response from model: {raw_response}")
-                
-                # Extract thinking process if present
-                thinking_content = None
-                thinking_match = re.search(r'<think>([\s\S]*?)</think>', raw_response)
-                if thinking_match and show_thinking:
-                    thinking_content = thinking_match.group(1).strip()
-                
-                return {
-                    "response": raw_response,
-                    "thinking_process": thinking_content
-                }
-            else:
-                return {
-                    "response": "Error: Unexpected response format from Ollama",
-                    "thinking_process": None
-                }
-                
+            result = {
+                "response": raw_response,
+                "thinking_process": thinking_content
+            }
+            
+            if cache_vector is not None:
+                semantic_cache.store(cache_scope, cache_vector, result)
+            
+            return dict(result)
+        else:
+            return {
+                "response": "Error: Unexpected response format from Ollama",
+                "thinking_process": None
+            }
+            
+    except httpx.TimeoutException as e:
+        error_message = f"Timed out communicating with Ollama: {str(e)}"
+        logger.error(error_message)
+        return {
+            "response": f"Error: {error_message}",
+            "thinking_process": None
+        }
     except Exception as e:
         error_message = f"Error communicating with Ollama: {str(e)}"
         logger.error(error_message)
@@ -199,18 +728,274 @@ async def _get_ollama_response(
             "thinking_process": None
         }
 
+async def _iter_ndjson_lines(response: httpx.Response) -> AsyncGenerator[bytes, None]:
+    """
+    Split a streamed NDJSON body into its non-empty lines.
+    
+    Frames on raw bytes rather than using aiter_lines(), so each record is
+    only decoded once, by the JSON parser.
+    
+    Args:
+        response: The streaming response
+        
+    Yields:
+        Each non-empty line, without its newline
+    """
+    buffer = bytearray()
+    async for piece in response.aiter_bytes(STREAM_READ_SIZE):
+        buffer += piece
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            line = bytes(buffer[start:end])
+            start = end + 1
+            if line.strip():
+                yield line
+        del buffer[:start]
+    
+    # The last record may not be newline-terminated
+    if buffer.strip():
+        yield bytes(buffer)
+
+def _parse_ollama_line(line: bytes) -> Tuple[Optional[str], bool]:
+    """Parse one Ollama NDJSON record into (content, done)."""
+    chunk_data = orjson.loads(line)
+    return chunk_data.get("message", {}).get("content"), chunk_data.get("done", False)
+
+def _parse_openai_line(line: bytes) -> Tuple[Optional[str], bool]:
+    """Parse one OpenAI SSE line into (content, done)."""
+    if not line.startswith(b"data:"):
+        return None, False
+    data = line[5:].strip()
+    if data == b"[DONE]":
+        return None, True
+    choices = orjson.loads(data).get("choices")
+    if not choices:
+        return None, False
+    return choices[0].get("delta", {}).get("content"), False
+
+def _parse_anthropic_line(line: bytes) -> Tuple[Optional[str], bool]:
+    """Parse one Anthropic SSE line into (content, done); event: lines are implied by the data type."""
+    if not line.startswith(b"data:"):
+        return None, False
+    event = orjson.loads(line[5:])
+    event_type = event.get("type")
+    if event_type == "content_block_delta":
+        return event.get("delta", {}).get("text"), False
+    if event_type == "error":
+        raise RuntimeError(event.get("error", {}).get("message", "stream error"))
+    return None, event_type == "message_stop"
+
+async def _coalesce_stream(
+    response: httpx.Response,
+    parse_line: Callable[[bytes], Tuple[Optional[str], bool]],
+    show_thinking: bool,
+    flush_every: int,
+    flush_interval: float,
+    delta_only: bool = False
+) -> AsyncGenerator[Dict[str, str], None]:
+    """
+    Turn a successful streaming response into coalesced content chunks.
+    
+    Args:
+        response: The open streaming response
+        parse_line: Parses one line of the body into (content, done)
+        show_thinking: Whether to include the model's thinking process
+        flush_every: Maximum number of deltas coalesced into one yield
+        flush_interval: Maximum seconds buffered content is held before yielding
+        delta_only: Only put full_response on the final chunk instead of
+            the running text on every chunk
+        
+    Yields:
+        Content chunks with the running full_response (final chunk only when
+        delta_only); the last also carries thinking_process
+    """
+    # Initialize variables to track the response
+    full_parts = []
+    thinking = _ThinkingTracker() if show_thinking else None
+    
+    # Content not yet yielded, coalesced to cut per-token overhead
+    pending_parts = []
+    last_flush = time.monotonic()
+    
+    # Process the streaming response
+    async for line in _iter_ndjson_lines(response):
+        try:
+            content, done = parse_line(line)
+        except (orjson.JSONDecodeError, AttributeError):
+            # Skip invalid records
+            continue
+        
+        if content:
+            # Update the full response
+            full_parts.append(content)
+            
+            # Track thinking content only when it will be returned
+            if thinking is not None:
+                thinking.feed(content)
+            
+            pending_parts.append(content)
+        
+        # Hold content until the batch is full or old enough
+        if not done and (
+            not pending_parts
+            or (
+                len(pending_parts) < flush_every
+                and time.monotonic() - last_flush < flush_interval
+            )
+        ):
+            continue
+        
+        # Prepare the chunk to yield; with delta_only the accumulated text
+        # is only joined once, on the final chunk
+        response_chunk = {"content": "".join(pending_parts)}
+        pending_parts.clear()
+        last_flush = time.monotonic()
+        
+        if done or not delta_only:
+            response_chunk["full_response"] = "".join(full_parts)
+        
+        if done:
+            
+            # Only include thinking process if requested
+            thinking_process = thinking.result() if thinking is not None else None
+            if thinking_process:
+                response_chunk["thinking_process"] = thinking_process
+            
+            yield response_chunk
+            return
+        
+        yield response_chunk
+    
+    # Flush anything still buffered if the stream ended without done
+    if pending_parts:
+        response_chunk = {"content": "".join(pending_parts)}
+        if not delta_only:
+            response_chunk["full_response"] = "".join(full_parts)
+        yield response_chunk
+
+async def _stream_chat(
+    label: str,
+    url: str,
+    payload: Dict,
+    headers: Dict[str, str],
+    parse_line: Callable[[bytes], Tuple[Optional[str], bool]],
+    show_thinking: bool,
+    flush_every: int,
+    flush_interval: float,
+    delta_only: bool = False
+) -> AsyncGenerator[Dict[str, str], None]:
+    """
+    Stream a chat completion, coalescing provider deltas into fewer yields.
+    
+    Args:
+        label: Provider name used in error messages
+        url: The streaming endpoint
+        payload: The request payload (with streaming enabled)
+        headers: The request headers
+        parse_line: Parses one line of the body into (content, done)
+        show_thinking: Whether to include the model's thinking process
+        flush_every: Maximum number of deltas coalesced into one yield
+        flush_interval: Maximum seconds buffered content is held before yielding
+        delta_only: Only put full_response on the final chunk instead of
+            the running text on every chunk
+        
+    Yields:
+        Content chunks with the running full_response (final chunk only when
+        delta_only); the last also carries thinking_process
+    """
+    try:
+        client = get_http_client()
+        limiter = _provider_limiter(url)
+        body = orjson.dumps(payload)
+        
+        # Opening the stream is retried like _post_json and holds the host's
+        # concurrency slot only until the response headers arrive, so long
+        # generations don't starve other calls; once accepted, nothing is retried
+        started = False
+        for attempt in range(PROVIDER_MAX_RETRIES + 1):
+            last_attempt = attempt == PROVIDER_MAX_RETRIES
+            await limiter.acquire()
+            held = True
+            try:
+                async with client.stream(
+                    "POST",
+                    url,
+                    content=body,
+                    headers=headers,
+                    timeout=REQUEST_TIMEOUT
+                ) as response:
+                    limiter.release()
+                    held = False
+                    
+                    if response.status_code != 200:
+                        # Drain the body so the connection goes back to the pool
+                        error_body = await response.aread()
+                        if response.status_code in RETRY_STATUS_CODES and not last_attempt:
+                            retry_wait = _retry_delay(attempt, response)
+                            logger.warning("Retrying %s after status %s", url, response.status_code)
+                        else:
+                            error_message = f"Error from {label} API: {response.status_code} - {error_body[:512].decode(errors='replace')}"
+                            logger.error(error_message)
+                            yield {"error": error_message}
+                            return
+                    else:
+                        started = True
+                        async for response_chunk in _coalesce_stream(
+                            response, parse_line, show_thinking, flush_every, flush_interval, delta_only
+                        ):
+                            yield response_chunk
+                        return
+            except RETRY_EXCEPTIONS as e:
+                if started or last_attempt:
+                    raise
+                retry_wait = _retry_delay(attempt)
+                logger.warning("Retrying %s after %s: %s", url, type(e).__name__, e)
+            finally:
+                if held:
+                    limiter.release()
+            
+            await asyncio.sleep(retry_wait)
+                
+    except httpx.TimeoutException as e:
+        error_message = f"Timed out communicating with {label}: {str(e)}"
+        logger.error(error_message)
+        yield {"error": error_message}
+    except Exception as e:
+        error_message = f"Error communicating with {label}: {str(e)}"
+        logger.error(error_message)
+        yield {"error": error_message}
+
+# The installed model list rarely changes, so /api/tags is cached briefly
+MODELS_CACHE_TTL_SECONDS = float(os.getenv("MODELS_CACHE_TTL_SECONDS", "30"))
+
+_models_cache: Optional[List[Dict]] = None
+_models_cache_expires = 0.0
+_models_cache_lock = asyncio.Lock()
+
 async def get_available_models():
     """Get a list of available models from Ollama."""
-    try:
-        async with httpx.AsyncClient() as client:
+    global _models_cache, _models_cache_expires
+    
+    if _models_cache is not None and time.monotonic() < _models_cache_expires:
+        return _models_cache
+    
+    # Only one request refreshes the cache; concurrent callers wait for it
+    async with _models_cache_lock:
+        if _models_cache is not None and time.monotonic() < _models_cache_expires:
+            return _models_cache
+        
+        try:
+            client = get_http_client()
             response = await client.get(f"{OLLAMA_BASE_URL}/api/tags")
             if response.status_code == 200:
-                return response.json().get("models", [])
+                _models_cache = orjson.loads(response.content).get("models", [])
+                _models_cache_expires = time.monotonic() + MODELS_CACHE_TTL_SECONDS
+                return _models_cache
             else:
                 return []
-    except Exception as e:
-        print(f"Error fetching models: {str(e)}")
-        return []
+        except Exception as e:
+            logger.error(f"Error fetching models: {str(e)}")
+            return []
 
 async def get_llm_response_stream(
     prompt: str,
@@ -221,7 +1006,10 @@ async def get_llm_response_stream(
     conversation_history: Optional[List[Dict[str, str]]] = None,
     prompt_type: str = DEFAULT_PROMPT_TYPE,
     context: Optional[str] = None,
-    show_thinking: bool = False
+    show_thinking: bool = False,
+    flush_every: int = STREAM_FLUSH_CHUNKS,
+    flush_interval: float = STREAM_FLUSH_SECONDS,
+    delta_only: bool = False
 ):
     """
     Stream a response from the LLM using the selected provider.
@@ -236,41 +1024,36 @@ async def get_llm_response_stream(
         prompt_type: Type of prompt (general, code, creative, academic)
         context: Additional context to include
         show_thinking: Whether to include the model's thinking process in the response
+        flush_every: Maximum number of provider chunks coalesced into one yield
+            (1 yields every chunk as it arrives)
+        flush_interval: Maximum seconds buffered content is held before yielding
+        delta_only: Opt in to the cheaper stream format, where only the final
+            chunk carries full_response; by default every chunk carries the
+            response so far
         
     Yields:
         Chunks of the response as they are generated
     """
-    # Select the appropriate provider handler based on LLM_PROVIDER
-    if LLM_PROVIDER == "ollama":
-        async for chunk in _get_ollama_response_stream(
-            prompt, model, system_prompt, temperature, max_tokens,
-            conversation_history, prompt_type, context, show_thinking
-        ):
-            yield chunk
-    elif LLM_PROVIDER == "openai":
-        if not OPENAI_API_KEY:
-            logger.error("OpenAI API key not provided")
-            yield {"error": "OpenAI API key not configured. Please set OPENAI_API_KEY in environment variables."}
-            return
-        async for chunk in _get_openai_response_stream(
-            prompt, model or OPENAI_DEFAULT_MODEL, system_prompt, temperature, max_tokens,
-            conversation_history, prompt_type, context, show_thinking
-        ):
-            yield chunk
-    elif LLM_PROVIDER == "anthropic":
-        if not ANTHROPIC_API_KEY:
-            logger.error("Anthropic API key not provided")
-            yield {"error": "Anthropic API key not configured. Please set ANTHROPIC_API_KEY in environment variables."}
-            return
-        async for chunk in _get_anthropic_response_stream(
-            prompt, model or ANTHROPIC_DEFAULT_MODEL, system_prompt, temperature, max_tokens,
-            conversation_history, prompt_type, context, show_thinking
-        ):
-            yield chunk
-    else:
+    provider = _PROVIDERS.get(LLM_PROVIDER)
+    if provider is None or provider.stream_handler is None:
         logger.error(f"Unsupported LLM provider for streaming: {LLM_PROVIDER}")
         yield {"error": f"Unsupported LLM provider for streaming: {LLM_PROVIDER}"}
         return
+    
+    if provider.api_key_variable and not provider.api_key:
+        logger.error(f"{provider.label} API key not provided")
+        yield {"error": f"{provider.label} API key not configured. Please set {provider.api_key_variable} in environment variables."}
+        return
+    
+    # Keep long conversations within the history token budget
+    conversation_history = await _compact_history(conversation_history)
+    
+    async for chunk in provider.stream_handler(
+        prompt, model or provider.default_model, system_prompt, temperature, max_tokens,
+        conversation_history, prompt_type, context, show_thinking,
+        flush_every, flush_interval, delta_only
+    ):
+        yield chunk
 
 async def _get_ollama_response_stream(
     prompt: str,
@@ -281,100 +1064,64 @@ async def _get_ollama_response_stream(
     conversation_history: Optional[List[Dict[str, str]]] = None,
     prompt_type: str = DEFAULT_PROMPT_TYPE,
     context: Optional[str] = None,
-    show_thinking: bool = False
+    show_thinking: bool = False,
+    flush_every: int = STREAM_FLUSH_CHUNKS,
+    flush_interval: float = STREAM_FLUSH_SECONDS,
+    delta_only: bool = False
 ):
     """Implementation of streaming for Ollama provider."""
-    # Prepare the messages
-    messages = []
+    # Prepare the request payload
+    payload = _build_ollama_payload(
+        prompt, model, system_prompt, temperature, max_tokens,
+        conversation_history, prompt_type, context, stream=True
+    )
     
+    async for chunk in _stream_chat(
+        "Ollama", f"{OLLAMA_BASE_URL}/api/chat", payload, STREAM_HEADERS,
+        _parse_ollama_line, show_thinking, flush_every, flush_interval, delta_only
+    ):
+        yield chunk
+
+OPENAI_THINKING_INSTRUCTION = "When solving problems or addressing complex questions, please use <think>...</think> tags to show your step-by-step reasoning before providing your final answer."
+
+def _openai_headers(stream: bool = False) -> Dict[str, str]:
+    """Build the OpenAI request headers."""
+    return {
+        **(STREAM_HEADERS if stream else JSON_HEADERS),
+        "Authorization": f"Bearer {OPENAI_API_KEY}"
+    }
+
+def _build_openai_payload(
+    prompt: str,
+    model: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    max_tokens: int,
+    conversation_history: Optional[List[Dict[str, str]]],
+    prompt_type: str,
+    context: Optional[str],
+    show_thinking: bool,
+    *,
+    stream: bool = False
+) -> Dict:
+    """Build the OpenAI chat completions payload."""
     # Use prompt engineering to create a system prompt if not provided
     if not system_prompt:
         system_prompt = create_system_prompt(prompt_type)
     
-    # Add system prompt
-    messages.append({"role": "system", "content": system_prompt})
-    
-    # Add conversation history if provided
-    if conversation_history:
-        messages.extend(conversation_history)
-    
-    # Use prompt engineering to enhance the user prompt if context is provided
-    if context:
-        enhanced_prompt = create_chat_prompt(prompt, conversation_history, context)
-        messages.append({"role": "user", "content": enhanced_prompt})
-    else:
-        messages.append({"role": "user", "content": prompt})
+    # If show_thinking is enabled, modify the system prompt to request thinking steps
+    if show_thinking:
+        system_prompt += "\n\n" + OPENAI_THINKING_INSTRUCTION
     
-    # Prepare the request payload
     payload = {
         "model": model,
-        "messages": messages,
-        "options": {
-            "temperature": temperature,
-            "num_predict": max_tokens
-        },
-        "stream": True  # Enable streaming
+        "messages": _build_messages(system_prompt, conversation_history, context, prompt),
+        "temperature": temperature,
+        "max_tokens": max_tokens
     }
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST",
-                f"{OLLAMA_BASE_URL}/api/chat",
-                json=payload,
-                timeout=DEFAULT_TIMEOUT
-            ) as response:
-                if response.status_code != 200:
-                    error_message = f"Error from Ollama API: {response.status_code}"
-                    yield {"error": error_message}
-                    return
-                
-                # Initialize variables to track the response
-                full_response = ""
-                thinking_content = ""
-                in_thinking_block = False
-                
-                # Process the streaming response
-                async for chunk in response.aiter_lines():
-                    if not chunk.strip():
-                        continue
-                    
-                    try:
-                        chunk_data = json.loads(chunk)
-                        if "message" in chunk_data and "content" in chunk_data["message"]:
-                            content = chunk_data["message"]["content"]
-                            
-                            # Update the full response
-                            full_response += content
-                            
-                            # Track thinking content
-                            if "<think>" in content:
-                                in_thinking_block = True
-                            
-                            if in_thinking_block:
-                                thinking_content += content
-                            
-                            if "</think>" in content:
-                                in_thinking_block = False
-                            
-                            # Prepare the chunk to yield
-                            response_chunk = {
-                                "content": content,
-                                "full_response": full_response
-                            }
-                            
-                            # Only include thinking process if requested
-                            if show_thinking and thinking_content:
-                                response_chunk["thinking_process"] = thinking_content
-                            
-                            yield response_chunk
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON
-                        continue
-                    
-    except Exception as e:
-        error_message = f"Error communicating with Ollama: {str(e)}"
-        yield {"error": error_message}
+    if stream:
+        payload["stream"] = True
+    return payload
 
 async def _get_openai_response(
     prompt: str,
@@ -388,90 +1135,60 @@ async def _get_openai_response(
     show_thinking: bool = False
 ) -> Dict[str, Optional[str]]:
     """Implementation for OpenAI provider."""
-    # Prepare the messages
-    messages = []
-    
-    # Use prompt engineering to create a system prompt if not provided
-    if not system_prompt:
-        system_prompt = create_system_prompt(prompt_type)
-    
-    # Add system prompt
-    messages.append({"role": "system", "content": system_prompt})
-    
-    # Add conversation history if provided
-    if conversation_history:
-        messages.extend(conversation_history)
-    
-    # Use prompt engineering to enhance the user prompt if context is provided
-    if context:
-        enhanced_prompt = create_chat_prompt(prompt, conversation_history, context)
-        messages.append({"role": "user", "content": enhanced_prompt})
-    else:
-        messages.append({"role": "user", "content": prompt})
-    
-    # If show_thinking is enabled, modify the system prompt to request thinking steps
-    if show_thinking:
-        thinking_instruction = """When solving problems or addressing complex questions, please use <think>...</think> tags to show your step-by-step reasoning before providing your final answer."""
-        if "content" in messages[0]:
-            messages[0]["content"] += "\n\n" + thinking_instruction
-    
-    # Prepare the request payload
-    payload = {
-        "model": model,
-        "messages": messages,
-        "temperature": temperature,
-        "max_tokens": max_tokens
-    }
+    payload = _build_openai_payload(
+        prompt, model, system_prompt, temperature, max_tokens,
+        conversation_history, prompt_type, context, show_thinking
+    )
     
     try:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {OPENAI_API_KEY}"
+        headers = _openai_headers()
+        
+        response = await _post_json(f"{OPENAI_BASE_URL}/chat/completions", payload, headers)
+        
+        if response.status_code != 200:
+            error_message = f"Error from OpenAI API: {response.status_code} - {response.text}"
+            logger.error(error_message)
+            return {
+                "response": f"Error: {error_message}",
+                "thinking_process": None
             }
+        
+        response_data = orjson.loads(response.content)
+        
+        # Extract the assistant's message
+        if "choices" in response_data and len(response_data["choices"]) > 0 and "message" in response_data["choices"][0]:
+            message = response_data["choices"][0]["message"]
+            raw_response = message.get("content", "")
             
-            response = await client.post(
-                f"{OPENAI_BASE_URL}/chat/completions",
-                json=payload,
-                headers=headers,
-                timeout=DEFAULT_TIMEOUT
-            )
-            
-            if response.status_code != 200:
-                error_message = f"Error from OpenAI API: {response.status_code} - {response.text}"
-                logger.error(error_message)
-                return {
-                    "response": f"Error: {error_message}",
-                    "thinking_process": None
-                }
+            # Extract thinking process if present
+            thinking_content = None
+            if show_thinking:
+                thinking = _extract_thinking(raw_response)
+                if thinking is not None:
+                    thinking_content = thinking.strip()
+            else:
+                # Clean the response if not showing thinking
+                stripped = _strip_thinking(raw_response)
+                if stripped is not None:
+                    raw_response = stripped.strip()
             
-            response_data = response.json()
+            return {
+                "response": raw_response,
+                "thinking_process": thinking_content
+            }
+        else:
+            return {
+                "response": "Error: Unexpected response format from OpenAI",
+                "thinking_process": None
+            }
             
-            # Extract the assistant's message
-            if "choices" in response_data and len(response_data["choices"]) > 0 and "message" in response_data["choices"][0]:
-                message = response_data["choices"][0]["message"]
-                raw_response = message.get("content", "")
-                
-                # Extract thinking process if present
-                thinking_content = None
-                thinking_match = re.search(r'<think>([\s\S]*?)</think>', raw_response)
-                if thinking_match and show_thinking:
-                    thinking_content = thinking_match.group(1).strip()
-                
-                # Clean the response if not showing thinking
-                if not show_thinking and thinking_match:
-                    raw_response = re.sub(r'<think>[\s\S]*?</think>', '', raw_response).strip()
-                
-                return {
-                    "response": raw_response,
-                    "thinking_process": thinking_content
-                }
-            else:
-                return {
-                    "response": "Error: Unexpected response format from OpenAI",
-                    "thinking_process": None
-                }
-                
+    except httpx.TimeoutException as e:
+        error_message = f"Timed out communicating with OpenAI: {str(e)}"
+        logger.error(error_message)
+        return {
+            "response": f"Error: {error_message}",
+            "thinking_process": None
+        }
     except Exception as e:
         error_message = f"Error communicating with OpenAI: {str(e)}"
         logger.error(error_message)
@@ -480,42 +1197,91 @@ async def _get_openai_response(
             "thinking_process": None
         }
 
-async def _get_anthropic_response(
+async def _get_openai_response_stream(
     prompt: str,
-    model: str = ANTHROPIC_DEFAULT_MODEL,
+    model: str = OPENAI_DEFAULT_MODEL,
     system_prompt: Optional[str] = None,
     temperature: float = DEFAULT_TEMPERATURE,
     max_tokens: int = DEFAULT_MAX_TOKENS,
     conversation_history: Optional[List[Dict[str, str]]] = None,
     prompt_type: str = DEFAULT_PROMPT_TYPE,
     context: Optional[str] = None,
-    show_thinking: bool = False
-) -> Dict[str, Optional[str]]:
-    """Implementation for Anthropic provider."""
-    # Prepare the messages
-    messages = []
+    show_thinking: bool = False,
+    flush_every: int = STREAM_FLUSH_CHUNKS,
+    flush_interval: float = STREAM_FLUSH_SECONDS,
+    delta_only: bool = False
+):
+    """Implementation of streaming for OpenAI provider."""
+    payload = _build_openai_payload(
+        prompt, model, system_prompt, temperature, max_tokens,
+        conversation_history, prompt_type, context, show_thinking, stream=True
+    )
     
+    async for chunk in _stream_chat(
+        "OpenAI", f"{OPENAI_BASE_URL}/chat/completions", payload, _openai_headers(stream=True),
+        _parse_openai_line, show_thinking, flush_every, flush_interval, delta_only
+    ):
+        yield chunk
+
+ANTHROPIC_THINKING_INSTRUCTION = "When solving problems, please use <think>...</think> tags to show your step-by-step reasoning before providing your final answer."
+
+def _anthropic_cached_text(text: str) -> Dict:
+    """Wrap text in an Anthropic content block marked as a prompt-cache breakpoint."""
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+def _anthropic_headers(stream: bool = False) -> Dict[str, str]:
+    """Build the Anthropic request headers."""
+    return {
+        **(STREAM_HEADERS if stream else JSON_HEADERS),
+        "x-api-key": ANTHROPIC_API_KEY,
+        "anthropic-version": "2023-06-01"
+    }
+
+def _build_anthropic_payload(
+    prompt: str,
+    model: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    max_tokens: int,
+    conversation_history: Optional[List[Dict[str, str]]],
+    prompt_type: str,
+    context: Optional[str],
+    show_thinking: bool,
+    *,
+    stream: bool = False
+) -> Dict:
+    """Build the Anthropic messages payload."""
     # Handle conversation history for Anthropic format
     anthropic_messages = []
     
+    # Anthropic has no system turns, so system messages in the history (such
+    # as the note left by history compaction) join the top-level system prompt
+    history_notes = []
+    
+    def add_turn(role: str, content: str):
+        # Turns must alternate, which a compacted history need not do
+        if anthropic_messages and anthropic_messages[-1]["role"] == role:
+            anthropic_messages[-1]["content"] += "\n\n" + content
+        else:
+            anthropic_messages.append({"role": role, "content": content})
+    
     # Add conversation history if provided
     if conversation_history:
         for msg in conversation_history:
-            if msg["role"] in ["user", "assistant"]:
-                anthropic_messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
+            if msg["role"] == "system":
+                history_notes.append(msg["content"])
+            elif msg["role"] in ["user", "assistant"]:
+                add_turn(msg["role"], msg["content"])
     
-    # Use prompt engineering to enhance the user prompt if context is provided
+    # Anthropic only allows a top-level system prompt, so context leads the
+    # new user turn, keeping the system prompt and history prefix stable
     if context:
-        enhanced_prompt = create_chat_prompt(prompt, conversation_history, context)
-        user_message = enhanced_prompt
+        user_message = f"Context:\n{context}\n\n{prompt}"
     else:
         user_message = prompt
     
     # Add the latest user message
-    anthropic_messages.append({"role": "user", "content": user_message})
+    add_turn("user", user_message)
     
     # Prepare the request payload for Anthropic
     payload = {
@@ -525,72 +1291,151 @@ async def _get_anthropic_response(
         "temperature": temperature
     }
     
-    # Add system prompt if provided
+    # Add system prompt if provided, marked as a cacheable prefix
+    if not system_prompt and prompt_type:
+        system_prompt = create_system_prompt(prompt_type)
     if system_prompt:
-        payload["system"] = system_prompt
-    elif prompt_type:
-        payload["system"] = create_system_prompt(prompt_type)
+        payload["system"] = [_anthropic_cached_text(system_prompt)]
     
-    # If show_thinking is enabled, modify the system prompt to request thinking steps
+    # If show_thinking is enabled, add a system block requesting thinking steps
     if show_thinking and "system" in payload:
-        thinking_instruction = " When solving problems, please use <think>...</think> tags to show your step-by-step reasoning before providing your final answer."
-        payload["system"] += thinking_instruction
+        payload["system"].append(_anthropic_cached_text(ANTHROPIC_THINKING_INSTRUCTION))
+    
+    # Notes from the history follow the cached system prompt
+    for note in history_notes:
+        payload.setdefault("system", []).append({"type": "text", "text": note})
+    
+    # Cache the committed history too, so only the new turn is billed in full
+    if len(anthropic_messages) > 1:
+        previous = anthropic_messages[-2]
+        anthropic_messages[-2] = {
+            "role": previous["role"],
+            "content": [_anthropic_cached_text(previous["content"])]
+        }
+    
+    if stream:
+        payload["stream"] = True
+    return payload
+
+async def _get_anthropic_response(
+    prompt: str,
+    model: str = ANTHROPIC_DEFAULT_MODEL,
+    system_prompt: Optional[str] = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    prompt_type: str = DEFAULT_PROMPT_TYPE,
+    context: Optional[str] = None,
+    show_thinking: bool = False
+) -> Dict[str, Optional[str]]:
+    """Implementation for Anthropic provider."""
+    payload = _build_anthropic_payload(
+        prompt, model, system_prompt, temperature, max_tokens,
+        conversation_history, prompt_type, context, show_thinking
+    )
     
     try:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Content-Type": "application/json",
-                "x-api-key": ANTHROPIC_API_KEY,
-                "anthropic-version": "2023-06-01"
+        headers = _anthropic_headers()
+        
+        response = await _post_json(f"{ANTHROPIC_BASE_URL}/messages", payload, headers)
+        
+        if response.status_code != 200:
+            error_message = f"Error from Anthropic API: {response.status_code} - {response.text}"
+            logger.error(error_message)
+            return {
+                "response": f"Error: {error_message}",
+                "thinking_process": None
             }
+        
+        response_data = orjson.loads(response.content)
+        
+        # Extract the assistant's message
+        if "content" in response_data:
+            content_blocks = response_data.get("content", [])
+            text_blocks = [block.get("text", "") for block in content_blocks if block.get("type") == "text"]
+            raw_response = "".join(text_blocks)
             
-            response = await client.post(
-                f"{ANTHROPIC_BASE_URL}/messages",
-                json=payload,
-                headers=headers,
-                timeout=DEFAULT_TIMEOUT
-            )
-            
-            if response.status_code != 200:
-                error_message = f"Error from Anthropic API: {response.status_code} - {response.text}"
-                logger.error(error_message)
-                return {
-                    "response": f"Error: {error_message}",
-                    "thinking_process": None
-                }
+            # Extract thinking process if present
+            thinking_content = None
+            if show_thinking:
+                thinking = _extract_thinking(raw_response)
+                if thinking is not None:
+                    thinking_content = thinking.strip()
+            else:
+                # Clean the response if not showing thinking
+                stripped = _strip_thinking(raw_response)
+                if stripped is not None:
+                    raw_response = stripped.strip()
             
-            response_data = response.json()
+            return {
+                "response": raw_response,
+                "thinking_process": thinking_content
+            }
+        else:
+            return {
+                "response": "Error: Unexpected response format from Anthropic",
+                "thinking_process": None
+            }
             
-            # Extract the assistant's message
-            if "content" in response_data:
-                content_blocks = response_data.get("content", [])
-                text_blocks = [block.get("text", "") for block in content_blocks if block.get("type") == "text"]
-                raw_response = "".join(text_blocks)
-                
-                # Extract thinking process if present
-                thinking_content = None
-                thinking_match = re.search(r'<think>([\s\S]*?)</think>', raw_response)
-                if thinking_match and show_thinking:
-                    thinking_content = thinking_match.group(1).strip()
-                
-                # Clean the response if not showing thinking
-                if not show_thinking and thinking_match:
-                    raw_response = re.sub(r'<think>[\s\S]*?</think>', '', raw_response).strip()
-                
-                return {
-                    "response": raw_response,
-                    "thinking_process": thinking_content
-                }
-            else:
-                return {
-                    "response": "Error: Unexpected response format from Anthropic",
-                    "thinking_process": None
-                }
-                
+    except httpx.TimeoutException as e:
+        error_message = f"Timed out communicating with Anthropic: {str(e)}"
+        logger.error(error_message)
+        return {
+            "response": f"Error: {error_message}",
+            "thinking_process": None
+        }
     except Exception as e:
         error_message = f"Error communicating with Anthropic: {str(e)}"
         logger.error(error_message)
         return {
             "response": f"Error: {error_message}",
             "thinking_process": None
-        } 
\ No newline at end of file
+        } 
+
+async def _get_anthropic_response_stream(
+    prompt: str,
+    model: str = ANTHROPIC_DEFAULT_MODEL,
+    system_prompt: Optional[str] = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    prompt_type: str = DEFAULT_PROMPT_TYPE,
+    context: Optional[str] = None,
+    show_thinking: bool = False,
+    flush_every: int = STREAM_FLUSH_CHUNKS,
+    flush_interval: float = STREAM_FLUSH_SECONDS,
+    delta_only: bool = False
+):
+    """Implementation of streaming for Anthropic provider."""
+    payload = _build_anthropic_payload(
+        prompt, model, system_prompt, temperature, max_tokens,
+        conversation_history, prompt_type, context, show_thinking, stream=True
+    )
+    
+    async for chunk in _stream_chat(
+        "Anthropic", f"{ANTHROPIC_BASE_URL}/messages", payload, _anthropic_headers(stream=True),
+        _parse_anthropic_line, show_thinking, flush_every, flush_interval, delta_only
+    ):
+        yield chunk
+
+class _Provider(NamedTuple):
+    """Handlers and configuration for one LLM provider."""
+    label: str
+    handler: Callable
+    stream_handler: Optional[Callable]
+    default_model: str
+    api_key: str = ""
+    api_key_variable: Optional[str] = None
+
+# Provider dispatch table, resolved once at import
+_PROVIDERS: Dict[str, _Provider] = {
+    "ollama": _Provider("Ollama", _get_ollama_response, _get_ollama_response_stream, DEFAULT_MODEL),
+    "openai": _Provider(
+        "OpenAI", _get_openai_response, _get_openai_response_stream, OPENAI_DEFAULT_MODEL,
+        OPENAI_API_KEY, "OPENAI_API_KEY"
+    ),
+    "anthropic": _Provider(
+        "Anthropic", _get_anthropic_response, _get_anthropic_response_stream, ANTHROPIC_DEFAULT_MODEL,
+        ANTHROPIC_API_KEY, "ANTHROPIC_API_KEY"
+    )
+}
@@ -1,5 +1,6 @@
-from typing import Dict, List, Optional, Any
-from app.core.utils import enhance_prompt, format_conversation_history
+import functools
+from typing import Dict, List, Optional
+from app.core.utils import format_conversation_history
 
 # Default system prompts for different use cases
 DEFAULT_SYSTEM_PROMPTS = {
@@ -76,6 +77,7 @@ Here is my well-structured academic response with citations...
 """
 }
 
+@functools.lru_cache(maxsize=64)
 def create_system_prompt(prompt_type: str = "general", custom_instructions: Optional[str] = None) -> str:
     """
     Create a system prompt based on the type and custom instructions.
@@ -112,26 +114,13 @@ def create_chat_prompt(
     Returns:
         The formatted chat prompt
     """
-    prompt_parts = []
-    
-    # Add instruction if provided
-    if instruction:
-        prompt_parts.append(f"Instruction: {instruction}")
-    
-    # Add conversation history if provided
-    if conversation_history:
-        history_text = format_conversation_history(conversation_history)
-        prompt_parts.append(f"Previous conversation:\n{history_text}")
-    
-    # Add context if provided
-    if context:
-        prompt_parts.append(f"Context:\n{context}")
-    
-    # Add user message
-    prompt_parts.append(f"User message: {user_message}")
-    
-    # Combine all parts
-    return "\n\n".join(prompt_parts)
+    # Assemble the optional sections in a fixed order in one expression
+    return (
+        (f"Instruction: {instruction}\n\n" if instruction else "")
+        + (f"Previous conversation:\n{format_conversation_history(conversation_history)}\n\n" if conversation_history else "")
+        + (f"Context:\n{context}\n\n" if context else "")
+        + f"User message: {user_message}"
+    )
 
 def create_code_prompt(
     user_query: str,
@@ -151,26 +140,12 @@ def create_code_prompt(
     Returns:
         The formatted code prompt
     """
-    prompt_parts = []
-    
-    # Add language if provided
-    if language:
-        prompt_parts.append(f"Programming language: {language}")
-    
-    # Add code context if provided
-    if code_context:
-        prompt_parts.append(f"Existing code:\n```\n{code_context}\n```")
-    
-    # Add requirements if provided
-    if requirements:
-        requirements_text = "\n".join([f"- {req}" for req in requirements])
-        prompt_parts.append(f"Requirements:\n{requirements_text}")
-    
-    # Add user query
-    prompt_parts.append(f"Task: {user_query}")
-    
-    # Add instruction for code format
-    prompt_parts.append("Please provide the code solution in a clear, efficient, and well-documented manner.")
-    
-    # Combine all parts
-    return "\n\n".join(prompt_parts) 
\ No newline at end of file
+    # Assemble the optional sections in a fixed order in one expression
+    requirements_text = "\n".join(f"- {req}" for req in requirements) if requirements else ""
+    return (
+        (f"Programming language: {language}\n\n" if language else "")
+        + (f"Existing code:\n```\n{code_context}\n```\n\n" if code_context else "")
+        + (f"Requirements:\n{requirements_text}\n\n" if requirements else "")
+        + f"Task: {user_query}\n\n"
+        + "Please provide the code solution in a clear, efficient, and well-documented manner."
+    )
@@ -1,8 +1,21 @@
-from typing import Dict, List, Optional, Any
-import json
+from typing import Dict, List, Optional, Any, Tuple
+import orjson
 import os
+import re
 from datetime import datetime
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from pydantic import BaseModel
+
+from app.core.logging import get_logger
+
+# Set up logging
+logger = get_logger("prompt_templates")
+
+# Number of rendered prompts memoised per manager
+TEMPLATE_RENDER_CACHE_SIZE = int(os.getenv("TEMPLATE_RENDER_CACHE_SIZE", "1024"))
+
+# All templates live in one append-only JSON Lines log in the templates dir
+TEMPLATE_INDEX_FILENAME = "_index.jsonl"
 
 class PromptTemplate(BaseModel):
     """Model for prompt templates with versioning."""
@@ -16,6 +29,31 @@ class PromptTemplate(BaseModel):
     tags: List[str] = []
     parameters: Dict[str, Any] = {}
     is_active: bool = True
+
+# {{key}} placeholders; braces are excluded so "{{{key}}}" matches the inner one
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([^{}]+)\}\}")
+
+def _compile_template(text: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Split a template into literal and placeholder segments.
+    
+    Args:
+        text: The template body
+        
+    Returns:
+        (text, key) pairs in order; key is None for literals, and placeholder
+        segments keep their raw "{{key}}" text for when no value is given
+    """
+    segments = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append((text[position:match.start()], None))
+        segments.append((match.group(0), match.group(1)))
+        position = match.end()
+    if position < len(text):
+        segments.append((text[position:], None))
+    return segments
     
 class PromptTemplateManager:
     """Manager for prompt templates with versioning and persistence."""
@@ -23,35 +61,115 @@ class PromptTemplateManager:
     def __init__(self, templates_dir: str = "data/templates"):
         """Initialize the template manager."""
         self.templates_dir = templates_dir
+        self.index_path = os.path.join(templates_dir, TEMPLATE_INDEX_FILENAME)
         self.templates: Dict[str, PromptTemplate] = {}
-        self._ensure_dir_exists()
-        self._load_templates()
+        # Parsed template bodies, kept beside the models so those stay plain data
+        self._compiled: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+        self._placeholders: Dict[str, frozenset] = {}
+        self._render_cached = lru_cache(maxsize=TEMPLATE_RENDER_CACHE_SIZE)(self._render)
+        # Index records not yet built into models, filled on first access
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
     
     def _ensure_dir_exists(self):
         """Ensure the templates directory exists."""
         os.makedirs(self.templates_dir, exist_ok=True)
     
-    def _load_templates(self):
-        """Load templates from disk."""
-        if not os.path.exists(self.templates_dir):
+    def _ensure_loaded(self):
+        """Read the index on first use, migrating per-template files on first run."""
+        if self._loaded:
+            return
+        self._loaded = True
+        self._ensure_dir_exists()
+        
+        if not os.path.exists(self.index_path):
+            self._migrate_template_files()
             return
         
+        # One read and one parse per record; later records supersede earlier ones
+        with open(self.index_path, "rb") as f:
+            records = f.read().splitlines()
+        
+        for record in records:
+            if not record.strip():
+                continue
+            try:
+                template_data = orjson.loads(record)
+                if template_data.get("deleted"):
+                    self._pending.pop(template_data["id"], None)
+                else:
+                    self._pending[template_data["id"]] = template_data
+            except Exception as e:
+                logger.error(f"Error loading template record: {str(e)}", exc_info=True)
+        
+        # Compact the log once superseded records dominate it
+        if len(records) > 2 * len(self._pending) + 16:
+            self._write_index()
+    
+    def _migrate_template_files(self):
+        """Load legacy per-template JSON files and write them to the index."""
         for filename in os.listdir(self.templates_dir):
             if filename.endswith(".json"):
                 try:
-                    with open(os.path.join(self.templates_dir, filename), "r") as f:
-                        template_data = json.load(f)
-                        template = PromptTemplate(**template_data)
+                    with open(os.path.join(self.templates_dir, filename), "rb") as f:
+                        template = PromptTemplate(**orjson.loads(f.read()))
                         self.templates[template.id] = template
+                        self._compile(template)
                 except Exception as e:
-                    print(f"Error loading template {filename}: {str(e)}")
+                    logger.error(f"Error loading template {filename}: {str(e)}", exc_info=True)
+        
+        self._write_index()
+    
+    def _write_index(self):
+        """Rewrite the index with one record per current template."""
+        temporary_path = f"{self.index_path}.tmp"
+        with open(temporary_path, "wb") as f:
+            for template in self.templates.values():
+                f.write(orjson.dumps(template.model_dump()) + b"\n")
+            for template_data in self._pending.values():
+                f.write(orjson.dumps(template_data) + b"\n")
+        os.replace(temporary_path, self.index_path)
+    
+    def _append_record(self, record: Dict[str, Any]):
+        """Append one record to the index."""
+        with open(self.index_path, "ab") as f:
+            f.write(orjson.dumps(record) + b"\n")
+    
+    def _promote(self, template_id: str) -> Optional[PromptTemplate]:
+        """Build a pending index record into a template."""
+        template_data = self._pending.pop(template_id)
+        try:
+            # Records come from our own writer, so validation is skipped
+            template = PromptTemplate.model_construct(**template_data)
+            self._compile(template)
+        except Exception as e:
+            logger.error(f"Error loading template {template_id}: {str(e)}", exc_info=True)
+            return None
+        self.templates[template.id] = template
+        return template
+    
+    def _forget(self, template_id: str):
+        """Drop a template from memory."""
+        self.templates.pop(template_id, None)
+        self._pending.pop(template_id, None)
+        self._compiled.pop(template_id, None)
+        self._placeholders.pop(template_id, None)
+        self._render_cached.cache_clear()
+    
+    def _compile(self, template: PromptTemplate):
+        """Parse a template body and record which placeholders it uses."""
+        segments = _compile_template(template.template)
+        self._compiled[template.id] = segments
+        self._placeholders[template.id] = frozenset(key for _, key in segments if key is not None)
+        self._render_cached.cache_clear()
     
     def save_template(self, template: PromptTemplate):
         """Save a template to disk."""
-        template_path = os.path.join(self.templates_dir, f"{template.id}.json")
-        with open(template_path, "w") as f:
-            f.write(json.dumps(template.dict(), indent=2))
+        self._ensure_loaded()
+        self._append_record(template.model_dump())
+        self._pending.pop(template.id, None)
         self.templates[template.id] = template
+        self._compile(template)
     
     def create_template(
         self,
@@ -96,11 +214,10 @@ class PromptTemplateManager:
         is_active: Optional[bool] = None
     ) -> PromptTemplate:
         """Update an existing template."""
-        if template_id not in self.templates:
-            raise ValueError(f"Template with ID {template_id} not found")
-        
         # Get the existing template
-        existing = self.templates[template_id]
+        existing = self.get_template(template_id)
+        if existing is None:
+            raise ValueError(f"Template with ID {template_id} not found")
         
         # Create a new version
         version_parts = existing.version.split(".")
@@ -128,10 +245,18 @@ class PromptTemplateManager:
     
     def get_template(self, template_id: str) -> Optional[PromptTemplate]:
         """Get a template by ID."""
-        return self.templates.get(template_id)
+        self._ensure_loaded()
+        template = self.templates.get(template_id)
+        if template is None and template_id in self._pending:
+            template = self._promote(template_id)
+        return template
     
     def get_templates(self, tag: Optional[str] = None, active_only: bool = True) -> List[PromptTemplate]:
         """Get all templates, optionally filtered by tag and active status."""
+        self._ensure_loaded()
+        for template_id in list(self._pending):
+            self._promote(template_id)
+        
         templates = list(self.templates.values())
         
         if active_only:
@@ -142,15 +267,27 @@ class PromptTemplateManager:
         
         return templates
     
+    def has_templates(self, active_only: bool = True) -> bool:
+        """Check whether any templates exist without building them."""
+        self._ensure_loaded()
+        return any(
+            not active_only or template.is_active for template in self.templates.values()
+        ) or any(
+            not active_only or template_data.get("is_active", True)
+            for template_data in self._pending.values()
+        )
+    
     def delete_template(self, template_id: str) -> bool:
         """Delete a template."""
-        if template_id not in self.templates:
+        self._ensure_loaded()
+        if template_id not in self.templates and template_id not in self._pending:
             return False
         
         # Remove from memory
-        del self.templates[template_id]
+        self._forget(template_id)
         
-        # Remove from disk
+        # Record the deletion and remove any legacy per-template file
+        self._append_record({"id": template_id, "deleted": True})
         template_path = os.path.join(self.templates_dir, f"{template_id}.json")
         if os.path.exists(template_path):
             os.remove(template_path)
@@ -163,22 +300,41 @@ class PromptTemplateManager:
         if not template:
             raise ValueError(f"Template with ID {template_id} not found")
         
-        # Simple string formatting
-        rendered = template.template
-        for key, value in variables.items():
-            rendered = rendered.replace(f"{{{{{key}}}}}", str(value))
+        # Static templates, or calls that fill none of the placeholders,
+        # render to the template body unchanged
+        if self._placeholders[template_id].isdisjoint(variables):
+            return template.template
         
-        return rendered
+        # Memoise on the values actually substituted; the type is part of the
+        # key since equal values (1, 1.0, True) can render differently
+        used = sorted(self._placeholders[template_id].intersection(variables))
+        items = tuple((key, type(variables[key]), variables[key]) for key in used)
+        try:
+            return self._render_cached(template_id, items)
+        except TypeError:
+            # Unhashable values are rendered directly
+            return self._render(template_id, items)
+    
+    def _render(self, template_id: str, items: Tuple[Tuple[str, type, Any], ...]) -> str:
+        """Substitute (key, type, value) items into a compiled template."""
+        values = {key: value for key, _, value in items}
+        
+        # Single pass over the precompiled segments; placeholders without a
+        # value are left as written
+        return "".join(
+            text if key is None or key not in values else str(values[key])
+            for text, key in self._compiled[template_id]
+        )
 
 # Initialize the template manager
 template_manager = PromptTemplateManager()
 
-# Create default templates if they don't exist
+# Create default templates if they don't exist; called from the app startup
+# hook so importing this module does no disk I/O
 def initialize_default_templates():
     """Initialize default templates."""
     # Check if we already have templates
-    existing_templates = template_manager.get_templates()
-    if existing_templates:
+    if template_manager.has_templates():
         return
     
     # General assistant template
@@ -231,6 +387,3 @@ User query: {{prompt}}""",
             "custom_instructions": "Any custom instructions for the model"
         }
     )
-
-# Initialize default templates
-initialize_default_templates() 
\ No newline at end of file
@@ -0,0 +1,68 @@
+import hashlib
+import orjson
+import threading
+from cachetools import TTLCache
+from typing import Any, Dict, Optional
+
+class ResponseCache:
+    """
+    In-memory TTL/LRU cache of LLM responses keyed on the full request.
+
+    Keys are digests of every input that can change the response, so a hit
+    is always an exact replay of an earlier request.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached responses
+            ttl: Seconds a response stays valid
+        """
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: Any) -> bytes:
+        """
+        Build a cache key from the request inputs.
+
+        Args:
+            parts: JSON-serializable request inputs
+
+        Returns:
+            A 16-byte digest of the canonical encoding of the inputs
+        """
+        canonical = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(canonical, digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Get a cached response.
+
+        Args:
+            key: The request key
+
+        Returns:
+            A copy of the cached response, or None on a miss
+        """
+        with self._lock:
+            result = self._cache.get(key)
+        return dict(result) if result is not None else None
+
+    def set(self, key: bytes, result: Dict[str, Optional[str]]) -> None:
+        """
+        Cache a response.
+
+        Args:
+            key: The request key
+            result: The response to cache
+        """
+        with self._lock:
+            self._cache[key] = dict(result)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._cache.clear()
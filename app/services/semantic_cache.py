@@ -0,0 +1,106 @@
+import numpy as np
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Logger setup
+import logging
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """
+    In-memory nearest-neighbour cache mapping prompts to previous responses.
+
+    Prompts are embedded and L2-normalised so a matrix product against the
+    stored vectors gives cosine similarity. Entries are partitioned by a scope
+    key (model, system prompt, ...) so a response is only reused where it
+    would have been produced by the same configuration.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Awaitable[Sequence[float]]],
+        threshold: float = 0.9,
+        max_entries: int = 1000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embed: Coroutine function returning the embedding of a text
+            threshold: Minimum cosine similarity for a cached response to be reused
+            max_entries: Maximum number of entries kept per scope (oldest evicted first)
+        """
+        self._embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[np.ndarray, List[Any]]] = {}
+
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a text as an L2-normalised vector.
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            The normalised embedding
+        """
+        vector = np.asarray(await self._embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, scope: Hashable, vector: np.ndarray) -> Optional[Any]:
+        """
+        Find the cached response for the nearest stored prompt.
+
+        Args:
+            scope: The partition to search
+            vector: The normalised embedding of the prompt
+
+        Returns:
+            The cached response, or None if nothing is similar enough
+        """
+        entry = self._entries.get(scope)
+        if entry is None:
+            return None
+
+        matrix, responses = entry
+        if matrix.shape[1] != vector.shape[0]:
+            return None
+
+        scores = matrix @ vector
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+
+        logger.debug("Semantic cache hit (similarity %.3f)", scores[best])
+        return responses[best]
+
+    def store(self, scope: Hashable, vector: np.ndarray, response: Any) -> None:
+        """
+        Store a response under the embedding of its prompt.
+
+        Args:
+            scope: The partition to store into
+            vector: The normalised embedding of the prompt
+            response: The response to cache
+        """
+        matrix, responses = self._entries.get(scope, (None, []))
+
+        # Start afresh if the embedding model (and so the dimension) changed
+        if matrix is None or matrix.shape[1] != vector.shape[0]:
+            matrix, responses = np.empty((0, vector.shape[0]), dtype=np.float32), []
+
+        matrix = np.vstack([matrix, vector[np.newaxis, :]])
+        responses.append(response)
+
+        # Evict the oldest entries once the scope is full
+        overflow = len(responses) - self.max_entries
+        if overflow > 0:
+            matrix = matrix[overflow:]
+            del responses[:overflow]
+
+        self._entries[scope] = (matrix, responses)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._entries.clear()
@@ -1,14 +1,13 @@
+import asyncio
+import heapq
 import httpx
 import os
-import json
-import re
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from typing import List, Dict, Any, Optional
 from bs4 import BeautifulSoup
 from urllib.parse import quote_plus, urlparse, urljoin
-import logging
 from datetime import datetime
 
-from app.core.config import settings
 from app.core.logging import get_logger
 
 # Set up logging
@@ -26,6 +25,50 @@ SERPER_API_KEY = os.getenv("SERPER_API_KEY", "")
 BING_SEARCH_API_KEY = os.getenv("BING_SEARCH_API_KEY", "")
 USE_DUCKDUCKGO = os.getenv("USE_DUCKDUCKGO", "false").lower() == "true"
 
+# Browser user agent for scraped pages and search engines
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Scraping and search traffic gets its own pool, so arbitrary sites cannot
+# starve the LLM provider connections
+SCRAPE_MAX_CONNECTIONS = int(os.getenv("SCRAPE_MAX_CONNECTIONS", "50"))
+SCRAPE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SCRAPE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+_scrape_client: Optional[httpx.AsyncClient] = None
+
+def get_scrape_client() -> httpx.AsyncClient:
+    """
+    Get the shared client for search providers and scraped pages.
+    
+    Its cookie jar refuses every cookie, so session state set by one site
+    for one user is never stored or sent on anyone else's later requests.
+    
+    Returns:
+        The pooled scraping client
+    """
+    global _scrape_client
+    
+    if _scrape_client is None or _scrape_client.is_closed:
+        _scrape_client = httpx.AsyncClient(
+            http2=True,
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            limits=httpx.Limits(
+                max_connections=SCRAPE_MAX_CONNECTIONS,
+                max_keepalive_connections=SCRAPE_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+    return _scrape_client
+
+async def close_scrape_client() -> None:
+    """Close the scraping client and its pooled connections."""
+    global _scrape_client
+    
+    if _scrape_client is not None:
+        await _scrape_client.aclose()
+        _scrape_client = None
+
+# Maximum number of result pages fetched at once for a single search
+FETCH_MAX_CONCURRENCY = int(os.getenv("WEB_FETCH_MAX_CONCURRENCY", "8"))
+
 # Normalize settings for backwards compatibility
 if not GOOGLE_SEARCH_API_KEY and SEARCH_API_KEY:
     GOOGLE_SEARCH_API_KEY = SEARCH_API_KEY
@@ -127,23 +170,23 @@ class WebSearchService:
             "num": min(num_results, 10)  # API limit is 10
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            data = response.json()
-            
-            if "items" not in data:
-                return []
-            
-            results = []
-            for item in data["items"]:
-                results.append({
-                    "title": item.get("title", ""),
-                    "link": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "source": "Google Search API"
-                })
-            
-            return results
+        client = get_scrape_client()
+        response = await client.get(url, params=params)
+        data = response.json()
+        
+        if "items" not in data:
+            return []
+        
+        results = []
+        for item in data["items"]:
+            results.append({
+                "title": item.get("title", ""),
+                "link": item.get("link", ""),
+                "snippet": item.get("snippet", ""),
+                "source": "Google Search API"
+            })
+        
+        return results
     
     @staticmethod
     async def _search_with_serper(query: str, num_results: int = 5) -> List[Dict[str, Any]]:
@@ -155,23 +198,23 @@ class WebSearchService:
             "num": num_results
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            data = response.json()
-            
-            if "organic" not in data:
-                return []
-            
-            results = []
-            for item in data["organic"][:num_results]:
-                results.append({
-                    "title": item.get("title", ""),
-                    "link": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "source": "Serper API"
-                })
-            
-            return results
+        client = get_scrape_client()
+        response = await client.get(url, params=params)
+        data = response.json()
+        
+        if "organic" not in data:
+            return []
+        
+        results = []
+        for item in data["organic"][:num_results]:
+            results.append({
+                "title": item.get("title", ""),
+                "link": item.get("link", ""),
+                "snippet": item.get("snippet", ""),
+                "source": "Serper API"
+            })
+        
+        return results
     
     @staticmethod
     async def _search_with_scraping(query: str, num_results: int = 5) -> List[Dict[str, Any]]:
@@ -200,12 +243,11 @@ class WebSearchService:
         ]
         
         headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+            "User-Agent": USER_AGENT,
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
             "Referer": "https://www.google.com/",
             "DNT": "1",
-            "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1"
         }
         
@@ -219,72 +261,72 @@ class WebSearchService:
             try:
                 logger.info(f"Attempting to scrape search results from {engine['name']}")
                 
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        engine["url"], 
-                        headers=headers,
-                        follow_redirects=True,
-                        timeout=10.0
-                    )
+                client = get_scrape_client()
+                response = await client.get(
+                    engine["url"], 
+                    headers=headers,
+                    follow_redirects=True,
+                    timeout=10.0
+                )
+                
+                # Check if we got a valid response
+                if response.status_code != 200:
+                    logger.warning(f"Failed to get results from {engine['name']}, status code: {response.status_code}")
+                    continue
                     
-                    # Check if we got a valid response
-                    if response.status_code != 200:
-                        logger.warning(f"Failed to get results from {engine['name']}, status code: {response.status_code}")
-                        continue
+                soup = BeautifulSoup(response.text, "html.parser")
+                
+                # Find all result elements
+                result_elements = soup.select(engine["result_selector"])
+                
+                engine_results = []
+                for element in result_elements:
+                    try:
+                        title_element = element.select_one(engine["title_selector"])
+                        link_element = element.select_one(engine["link_selector"])
+                        snippet_element = element.select_one(engine["snippet_selector"])
                         
-                    soup = BeautifulSoup(response.text, "html.parser")
-                    
-                    # Find all result elements
-                    result_elements = soup.select(engine["result_selector"])
-                    
-                    engine_results = []
-                    for element in result_elements:
-                        try:
-                            title_element = element.select_one(engine["title_selector"])
-                            link_element = element.select_one(engine["link_selector"])
-                            snippet_element = element.select_one(engine["snippet_selector"])
+                        if title_element and link_element:
+                            title = title_element.get_text(strip=True)
+                            link = link_element.get("href", "")
                             
-                            if title_element and link_element:
-                                title = title_element.get_text(strip=True)
-                                link = link_element.get("href", "")
-                                
-                                # Fix relative URLs
-                                if link.startswith("/"):
-                                    parsed_url = urlparse(engine["url"])
-                                    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                                    link = urljoin(base_url, link)
-                                
-                                # Extract snippet or use a placeholder
-                                snippet = ""
-                                if snippet_element:
-                                    snippet = snippet_element.get_text(strip=True)
-                                
-                                # Skip if title or link is empty
-                                if not title or not link:
-                                    continue
-                                    
-                                # Skip if link is not a valid URL
-                                if not link.startswith(("http://", "https://")):
-                                    continue
+                            # Fix relative URLs
+                            if link.startswith("/"):
+                                parsed_url = urlparse(engine["url"])
+                                base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+                                link = urljoin(base_url, link)
+                            
+                            # Extract snippet or use a placeholder
+                            snippet = ""
+                            if snippet_element:
+                                snippet = snippet_element.get_text(strip=True)
+                            
+                            # Skip if title or link is empty
+                            if not title or not link:
+                                continue
                                 
-                                engine_results.append({
-                                    "title": title,
-                                    "link": link,
-                                    "snippet": snippet,
-                                    "source": f"{engine['name']} (Scraped)"
-                                })
-                        except Exception as e:
-                            logger.error(f"Error parsing individual search result from {engine['name']}: {str(e)}")
-                    
-                    # Deduplicate results based on URLs
-                    seen_urls = {r["link"] for r in results}
-                    unique_results = [r for r in engine_results if r["link"] not in seen_urls]
-                    
-                    # Add unique results
-                    results.extend(unique_results[:num_results - len(results)])
-                    
-                    if len(results) >= num_results:
-                        break
+                            # Skip if link is not a valid URL
+                            if not link.startswith(("http://", "https://")):
+                                continue
+                            
+                            engine_results.append({
+                                "title": title,
+                                "link": link,
+                                "snippet": snippet,
+                                "source": f"{engine['name']} (Scraped)"
+                            })
+                    except Exception as e:
+                        logger.error(f"Error parsing individual search result from {engine['name']}: {str(e)}")
+                
+                # Deduplicate results based on URLs
+                seen_urls = {r["link"] for r in results}
+                unique_results = [r for r in engine_results if r["link"] not in seen_urls]
+                
+                # Add unique results
+                results.extend(unique_results[:num_results - len(results)])
+                
+                if len(results) >= num_results:
+                    break
             
             except Exception as e:
                 logger.error(f"Error scraping search results from {engine['name']}: {str(e)}")
@@ -304,30 +346,30 @@ class WebSearchService:
         """
         try:
             headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+                "User-Agent": USER_AGENT
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, follow_redirects=True)
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.extract()
-                
-                # Get text
-                text = soup.get_text()
-                
-                # Break into lines and remove leading and trailing space
-                lines = (line.strip() for line in text.splitlines())
-                
-                # Break multi-headlines into a line each
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                
-                # Remove blank lines
-                text = '\n'.join(chunk for chunk in chunks if chunk)
-                
-                return text
+            client = get_scrape_client()
+            response = await client.get(url, headers=headers, follow_redirects=True)
+            soup = BeautifulSoup(response.text, "html.parser")
+            
+            # Remove script and style elements
+            for script in soup(["script", "style"]):
+                script.extract()
+            
+            # Get text
+            text = soup.get_text()
+            
+            # Break into lines and remove leading and trailing space
+            lines = (line.strip() for line in text.splitlines())
+            
+            # Break multi-headlines into a line each
+            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+            
+            # Remove blank lines
+            text = '\n'.join(chunk for chunk in chunks if chunk)
+            
+            return text
         except Exception as e:
             logger.error(f"Error fetching webpage content: {str(e)}")
             return None
@@ -360,26 +402,24 @@ class WebSearchService:
             if len(para) < 20:  # Skip very short paragraphs
                 continue
                 
-            score = 0
             para_lower = para.lower()
-            for keyword in keywords:
-                if keyword in para_lower:
-                    score += 1
+            score = sum(keyword in para_lower for keyword in keywords)
             
             scored_paragraphs.append((score, para))
         
-        # Sort by score (highest first)
-        scored_paragraphs.sort(reverse=True)
+        # Only the best paragraphs can fit, as each takes at least 21 chars
+        top_paragraphs = heapq.nlargest(max_chars // 21 + 1, scored_paragraphs)
         
         # Combine top paragraphs up to max_chars
-        result = ""
-        for _, para in scored_paragraphs:
-            if len(result) + len(para) + 1 <= max_chars:
-                result += para + "\n"
-            else:
+        selected = []
+        length = 0
+        for _, para in top_paragraphs:
+            if length + len(para) + 1 > max_chars:
                 break
+            selected.append(para)
+            length += len(para) + 1
         
-        return result
+        return "".join(f"{para}\n" for para in selected)
     
     @staticmethod
     def format_search_results_for_llm(results: List[Dict[str, Any]], contents: List[str]) -> str:
@@ -396,24 +436,26 @@ class WebSearchService:
         if not results:
             return "No search results found."
         
-        formatted_text = "### Search Results:\n\n"
+        parts = ["### Search Results:\n\n"]
         
         for i, (result, content) in enumerate(zip(results, contents)):
-            formatted_text += f"[{i+1}] {result['title']}\n"
-            formatted_text += f"URL: {result['link']}\n"
-            formatted_text += f"Snippet: {result['snippet']}\n"
+            parts.append(
+                f"[{i+1}] {result['title']}\n"
+                f"URL: {result['link']}\n"
+                f"Snippet: {result['snippet']}\n"
+            )
             
             if content:
                 # Truncate content if too long
                 if len(content) > 500:
                     content = content[:497] + "..."
-                formatted_text += f"Content: {content}\n"
+                parts.append(f"Content: {content}\n")
             
-            formatted_text += "\n"
+            parts.append("\n")
         
-        formatted_text += f"Search performed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        parts.append(f"Search performed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         
-        return formatted_text
+        return "".join(parts)
     
     @staticmethod
     async def search_and_retrieve(query: str, num_results: int = 3) -> Dict[str, Any]:
@@ -430,16 +472,20 @@ class WebSearchService:
         # Search the web
         search_results = await WebSearchService.search_web(query, num_results)
         
-        # Fetch content from each result
-        contents = []
-        for result in search_results:
-            content = await WebSearchService.fetch_webpage_content(result["link"])
-            if content:
-                # Extract relevant information
-                relevant_content = WebSearchService.extract_relevant_info(content, query)
-                contents.append(relevant_content)
-            else:
-                contents.append("")
+        # Fetch content from all results concurrently, a few pages at a time
+        semaphore = asyncio.Semaphore(FETCH_MAX_CONCURRENCY)
+        
+        async def fetch(url: str) -> Optional[str]:
+            async with semaphore:
+                return await WebSearchService.fetch_webpage_content(url)
+        
+        pages = await asyncio.gather(*(fetch(result["link"]) for result in search_results))
+        
+        # Extract relevant information
+        contents = [
+            WebSearchService.extract_relevant_info(content, query) if content else ""
+            for content in pages
+        ]
         
         # Format for LLM
         formatted_text = WebSearchService.format_search_results_for_llm(search_results, contents)
@@ -474,30 +520,30 @@ class WebSearchService:
             "safesearch": "moderate"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.bing.microsoft.com/v7.0/search",
-                headers=headers,
-                params=params
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Bing search error: {response.status_code} - {response.text}")
-                return []
-            
-            data = response.json()
-            results = []
-            
-            if "webPages" in data and "value" in data["webPages"]:
-                for item in data["webPages"]["value"][:num_results]:
-                    results.append({
-                        "title": item.get("name", ""),
-                        "link": item.get("url", ""),
-                        "snippet": item.get("snippet", ""),
-                        "source": "Bing Search API"
-                    })
-            
-            return results
+        client = get_scrape_client()
+        response = await client.get(
+            "https://api.bing.microsoft.com/v7.0/search",
+            headers=headers,
+            params=params
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"Bing search error: {response.status_code} - {response.text}")
+            return []
+        
+        data = response.json()
+        results = []
+        
+        if "webPages" in data and "value" in data["webPages"]:
+            for item in data["webPages"]["value"][:num_results]:
+                results.append({
+                    "title": item.get("name", ""),
+                    "link": item.get("url", ""),
+                    "snippet": item.get("snippet", ""),
+                    "source": "Bing Search API"
+                })
+        
+        return results
     
     @staticmethod
     async def _search_with_duckduckgo(query: str, num_results: int = 5) -> List[Dict[str, Any]]:
@@ -516,43 +562,43 @@ class WebSearchService:
         url = f"https://html.duckduckgo.com/html/?q={encoded_query}"
         
         headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+            "User-Agent": USER_AGENT
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, "html.parser")
+        client = get_scrape_client()
+        response = await client.get(url, headers=headers)
+        soup = BeautifulSoup(response.text, "html.parser")
+        
+        results = []
+        for result in soup.select(".result")[:num_results]:
+            title_element = result.select_one(".result__a")
+            snippet_element = result.select_one(".result__snippet")
             
-            results = []
-            for result in soup.select(".result")[:num_results]:
-                title_element = result.select_one(".result__a")
-                snippet_element = result.select_one(".result__snippet")
+            if title_element and snippet_element:
+                title = title_element.text.strip()
+                link = title_element.get("href", "")
                 
-                if title_element and snippet_element:
-                    title = title_element.text.strip()
-                    link = title_element.get("href", "")
-                    
-                    # Extract the actual URL from DuckDuckGo's redirect
-                    if link.startswith("/"):
-                        # Parse the URL from the redirect
-                        try:
-                            params = dict(param.split("=") for param in link.split("?")[1].split("&"))
-                            if "uddg" in params:
-                                link = params["uddg"]
-                        except:
-                            # If parsing fails, use the original link
-                            pass
-                    
-                    snippet = snippet_element.text.strip()
-                    
-                    results.append({
-                        "title": title,
-                        "link": link,
-                        "snippet": snippet,
-                        "source": "DuckDuckGo"
-                    })
-            
-            return results
+                # Extract the actual URL from DuckDuckGo's redirect
+                if link.startswith("/"):
+                    # Parse the URL from the redirect
+                    try:
+                        params = dict(param.split("=") for param in link.split("?")[1].split("&"))
+                        if "uddg" in params:
+                            link = params["uddg"]
+                    except:
+                        # If parsing fails, use the original link
+                        pass
+                
+                snippet = snippet_element.text.strip()
+                
+                results.append({
+                    "title": title,
+                    "link": link,
+                    "snippet": snippet,
+                    "source": "DuckDuckGo"
+                })
+        
+        return results
 
 # Create a global instance
 web_search = WebSearchService() 
\ No newline at end of file
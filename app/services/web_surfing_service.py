@@ -1,21 +1,13 @@
-import httpx
 import os
+import asyncio
 import json
 import re
-import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional
 from bs4 import BeautifulSoup
-from urllib.parse import quote_plus, urljoin, urlparse
-import logging
-from datetime import datetime
-import base64
-from io import BytesIO
-from PIL import Image
-import time
+from urllib.parse import quote_plus, urljoin
 
-from app.core.config import settings
 from app.core.logging import get_logger
-from app.services.web_search import WebSearchService
+from app.services.web_search import WebSearchService, get_scrape_client
 from app.services.llm_service import get_llm_response
 
 # Set up logging
@@ -186,32 +178,32 @@ class WebSurfingService:
                 return await WebSurfingService._process_with_browserless(url, query)
             else:
                 # Fallback to simple HTTP request
-                async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-                    response = await client.get(url)
-                    if response.status_code != 200:
-                        return None
-                    
-                    soup = BeautifulSoup(response.text, "html.parser")
-                    
-                    # Remove script and style elements
-                    for script in soup(["script", "style"]):
-                        script.extract()
-                    
-                    # Get text content
-                    text = soup.get_text(separator=" ", strip=True)
-                    
-                    # Clean up text
-                    lines = (line.strip() for line in text.splitlines())
-                    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                    text = " ".join(chunk for chunk in chunks if chunk)
-                    
-                    # Extract relevant portion based on query
-                    relevant_text = WebSearchService.extract_relevant_info(text, query)
-                    
-                    return {
-                        "text": relevant_text,
-                        "visuals": []  # No visuals in simple mode
-                    }
+                client = get_scrape_client()
+                response = await client.get(url, follow_redirects=True, timeout=30.0)
+                if response.status_code != 200:
+                    return None
+                
+                soup = BeautifulSoup(response.text, "html.parser")
+                
+                # Remove script and style elements
+                for script in soup(["script", "style"]):
+                    script.extract()
+                
+                # Get text content
+                text = soup.get_text(separator=" ", strip=True)
+                
+                # Clean up text
+                lines = (line.strip() for line in text.splitlines())
+                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+                text = " ".join(chunk for chunk in chunks if chunk)
+                
+                # Extract relevant portion based on query
+                relevant_text = WebSearchService.extract_relevant_info(text, query)
+                
+                return {
+                    "text": relevant_text,
+                    "visuals": []  # No visuals in simple mode
+                }
         except Exception as e:
             logger.error(f"Error processing webpage {url}: {str(e)}")
             return None
@@ -249,55 +241,56 @@ class WebSurfingService:
             }
             
             # Call browserless.io API
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{BROWSERLESS_URL}/scrape?token={BROWSERLESS_API_KEY}",
-                    json=script
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"Browserless API error: {response.status_code} - {response.text}")
-                    return {"text": "", "visuals": []}
-                
-                result = response.json()
-                
-                # Extract text content
-                text_content = ""
-                for element in result.get("data", []):
-                    if "text" in element:
-                        text_content += element["text"] + " "
-                
-                # Extract relevant portion based on query
-                relevant_text = WebSearchService.extract_relevant_info(text_content, query)
-                
-                # Extract visual content (screenshots)
-                visuals = []
-                if "screenshot" in result:
-                    visuals.append({
-                        "type": "screenshot",
-                        "source": url,
-                        "data": result["screenshot"]
-                    })
-                
-                # Extract images from the page
-                for element in result.get("data", []):
-                    if "attributes" in element and "src" in element["attributes"]:
-                        if element["tagName"].lower() == "img":
-                            img_url = element["attributes"]["src"]
-                            if not img_url.startswith(("http://", "https://")):
-                                img_url = urljoin(url, img_url)
-                            
-                            visuals.append({
-                                "type": "image",
-                                "source": img_url,
-                                "alt": element["attributes"].get("alt", ""),
-                                "data": None  # We don't fetch the actual image data here
-                            })
-                
-                return {
-                    "text": relevant_text,
-                    "visuals": visuals
-                }
+            client = get_scrape_client()
+            response = await client.post(
+                f"{BROWSERLESS_URL}/scrape?token={BROWSERLESS_API_KEY}",
+                json=script,
+                timeout=60.0
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"Browserless API error: {response.status_code} - {response.text}")
+                return {"text": "", "visuals": []}
+            
+            result = response.json()
+            
+            # Extract text content
+            text_content = ""
+            for element in result.get("data", []):
+                if "text" in element:
+                    text_content += element["text"] + " "
+            
+            # Extract relevant portion based on query
+            relevant_text = WebSearchService.extract_relevant_info(text_content, query)
+            
+            # Extract visual content (screenshots)
+            visuals = []
+            if "screenshot" in result:
+                visuals.append({
+                    "type": "screenshot",
+                    "source": url,
+                    "data": result["screenshot"]
+                })
+            
+            # Extract images from the page
+            for element in result.get("data", []):
+                if "attributes" in element and "src" in element["attributes"]:
+                    if element["tagName"].lower() == "img":
+                        img_url = element["attributes"]["src"]
+                        if not img_url.startswith(("http://", "https://")):
+                            img_url = urljoin(url, img_url)
+                        
+                        visuals.append({
+                            "type": "image",
+                            "source": img_url,
+                            "alt": element["attributes"].get("alt", ""),
+                            "data": None  # We don't fetch the actual image data here
+                        })
+            
+            return {
+                "text": relevant_text,
+                "visuals": visuals
+            }
         except Exception as e:
             logger.error(f"Error with browserless for {url}: {str(e)}")
             return {"text": "", "visuals": []}
@@ -474,24 +467,29 @@ class WebSurfingService:
             return synthesis
         
         # Check if maps are needed
-        needs_map = False
         map_locations = []
         
         # Extract location information from the synthesis
-        for section in synthesis.get("detailed_sections", []):
-            for visual in section.get("visual_elements", []):
-                if visual.get("type") == "map":
-                    needs_map = True
-                    description = visual.get("description", "")
-                    
-                    # Extract location from description
-                    locations = await WebSurfingService._extract_locations(description, task_description)
-                    if locations:
-                        for location in locations:
-                            map_locations.append({
-                                "name": location,
-                                "visual_id": id(visual)  # Use object id as a unique identifier
-                            })
+        map_visuals = [
+            visual
+            for section in synthesis.get("detailed_sections", [])
+            for visual in section.get("visual_elements", [])
+            if visual.get("type") == "map"
+        ]
+        needs_map = bool(map_visuals)
+        
+        # Extract locations from all descriptions concurrently
+        all_locations = await asyncio.gather(*(
+            WebSurfingService._extract_locations(visual.get("description", ""), task_description)
+            for visual in map_visuals
+        ))
+        for visual, locations in zip(map_visuals, all_locations):
+            if locations:
+                for location in locations:
+                    map_locations.append({
+                        "name": location,
+                        "visual_id": id(visual)  # Use object id as a unique identifier
+                    })
         
         if needs_map and map_locations:
             # Generate static map URLs
@@ -519,13 +517,21 @@ class WebSurfingService:
             Updated synthesis dictionary with chart data
         """
         # Check if charts are needed
-        for section in synthesis.get("detailed_sections", []):
-            for visual in section.get("visual_elements", []):
-                if visual.get("type") in ["chart", "graph", "comparison"]:
-                    # Extract chart data from description
-                    chart_data = await WebSurfingService._extract_chart_data(visual.get("description", ""), task_description)
-                    if chart_data:
-                        visual["chart_data"] = chart_data
+        chart_visuals = [
+            visual
+            for section in synthesis.get("detailed_sections", [])
+            for visual in section.get("visual_elements", [])
+            if visual.get("type") in ["chart", "graph", "comparison"]
+        ]
+        
+        # Extract chart data from all descriptions concurrently
+        all_chart_data = await asyncio.gather(*(
+            WebSurfingService._extract_chart_data(visual.get("description", ""), task_description)
+            for visual in chart_visuals
+        ))
+        for visual, chart_data in zip(chart_visuals, all_chart_data):
+            if chart_data:
+                visual["chart_data"] = chart_data
         
         return synthesis
     
@@ -752,61 +758,77 @@ class WebSurfingService:
         
         # Step 2: Gather information for each subtask with depth control
         results = {}
+        extraction_tasks = []
         processed_pages = 0
         
-        for subtask in subtasks:
-            # Skip if we've reached the maximum pages to process
-            if processed_pages >= max_pages_to_process:
-                break
-            
-            subtask_results = {
-                "text_content": [],
-                "visual_content": [],
-                "structured_data": {}
-            }
-            
-            # Process each search query for the subtask
-            for query in subtask["search_queries"][:depth]:  # Limit queries based on depth
+        try:
+            for subtask in subtasks:
                 # Skip if we've reached the maximum pages to process
                 if processed_pages >= max_pages_to_process:
                     break
                 
-                # Get search results
-                search_results = await WebSearchService.search_web(query, num_results=num_results_per_query)
+                subtask_results = {
+                    "text_content": [],
+                    "visual_content": [],
+                    "structured_data": {}
+                }
                 
-                # Process each search result
-                for result in search_results:
+                # Process each search query for the subtask
+                for query in subtask["search_queries"][:depth]:  # Limit queries based on depth
                     # Skip if we've reached the maximum pages to process
                     if processed_pages >= max_pages_to_process:
                         break
                     
-                    # Fetch and process webpage content
-                    needs_visual = use_visual and subtask.get("needs_visual", False)
-                    content = await WebSurfingService._process_webpage(result["link"], query, needs_visual)
+                    # Get search results
+                    search_results = await WebSearchService.search_web(query, num_results=num_results_per_query)
                     
-                    if content:
-                        subtask_results["text_content"].append({
-                            "source": result["link"],
-                            "title": result["title"],
-                            "content": content["text"]
-                        })
+                    # Process each search result
+                    for result in search_results:
+                        # Skip if we've reached the maximum pages to process
+                        if processed_pages >= max_pages_to_process:
+                            break
                         
-                        # Add visual content if available
-                        if "visuals" in content and content["visuals"]:
-                            subtask_results["visual_content"].extend(content["visuals"])
+                        # Fetch and process webpage content
+                        needs_visual = use_visual and subtask.get("needs_visual", False)
+                        content = await WebSurfingService._process_webpage(result["link"], query, needs_visual)
                         
-                        processed_pages += 1
-            
-            # Extract structured data based on the subtask
-            if subtask_results["text_content"]:
-                subtask_results["structured_data"] = await WebSurfingService._extract_structured_data(
-                    subtask_results["text_content"], 
-                    subtask["name"], 
-                    subtask["description"],
-                    subtask.get("structured_data_type", "general")
-                )
+                        if content:
+                            subtask_results["text_content"].append({
+                                "source": result["link"],
+                                "title": result["title"],
+                                "content": content["text"]
+                            })
+                            
+                            # Add visual content if available
+                            if "visuals" in content and content["visuals"]:
+                                subtask_results["visual_content"].extend(content["visuals"])
+                            
+                            processed_pages += 1
+                
+                # Start extracting structured data for the subtask in the
+                # background so the model call overlaps the next subtask's fetches;
+                # kept as a list so a repeated subtask name can't orphan a task
+                if subtask_results["text_content"]:
+                    extraction_tasks.append((subtask["name"], asyncio.create_task(
+                        WebSurfingService._extract_structured_data(
+                            subtask_results["text_content"], 
+                            subtask["name"], 
+                            subtask["description"],
+                            subtask.get("structured_data_type", "general")
+                        )
+                    )))
+                
+                results[subtask["name"]] = subtask_results
             
-            results[subtask["name"]] = subtask_results
+            # Collect the structured data extractions
+            for name, task in extraction_tasks:
+                results[name]["structured_data"] = await task
+        finally:
+            # Don't leave extractions calling the model if a fetch failed or
+            # the request was cancelled, and retrieve every task's outcome
+            for _, task in extraction_tasks:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in extraction_tasks), return_exceptions=True)
         
         # Step 3: Synthesize the information into a structured response
         structured_response = await WebSurfingService._synthesize_information(results, task_description, task_type)
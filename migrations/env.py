@@ -17,6 +17,7 @@ load_dotenv()
 # Import the SQLAlchemy models
 from app.core.database import Base
 from app.models.user_models import User, APIKey, UsageRecord
+from app.models.chat_models import ChatHistory, UserContext
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
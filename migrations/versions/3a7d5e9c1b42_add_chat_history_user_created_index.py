@@ -0,0 +1,42 @@
+"""add_chat_history_user_created_index
+
+Revision ID: 3a7d5e9c1b42
+Revises: b4e1f09a7c25
+Create Date: 2026-10-16 18:05:22.914371
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3a7d5e9c1b42'
+down_revision = 'b4e1f09a7c25'
+branch_labels = None
+depends_on = None
+
+
+def _chat_history_indexes():
+    """Get the index names on chat_history, or None if the table doesn't exist."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('chat_history'):
+        return None
+    return {index['name'] for index in inspector.get_indexes('chat_history')}
+
+
+def upgrade():
+    # chat_history is not created by an earlier revision; skip databases
+    # that don't have it yet or already got the index from the model
+    indexes = _chat_history_indexes()
+    if indexes is None or 'ix_chat_user_created' in indexes:
+        return
+    
+    # Serves the per-user, newest-first chat history listing
+    op.create_index('ix_chat_user_created', 'chat_history', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    indexes = _chat_history_indexes()
+    if not indexes or 'ix_chat_user_created' not in indexes:
+        return
+    
+    op.drop_index('ix_chat_user_created', table_name='chat_history')
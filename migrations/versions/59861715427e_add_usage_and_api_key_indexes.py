@@ -0,0 +1,30 @@
+"""add_usage_and_api_key_indexes
+
+Revision ID: 59861715427e
+Revises: c07a90cf8cf3
+Create Date: 2026-10-16 09:12:41.318204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '59861715427e'
+down_revision = 'c07a90cf8cf3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Composite indexes for per-user / per-key usage queries ordered by time
+    op.create_index('ix_usage_user_created', 'usage_records', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_usage_apikey_created', 'usage_records', ['api_key_id', 'created_at'], unique=False)
+    
+    # Index for listing a user's active API keys
+    op.create_index('ix_apikey_user_active', 'api_keys', ['user_id', 'is_active'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_apikey_user_active', table_name='api_keys')
+    op.drop_index('ix_usage_apikey_created', table_name='usage_records')
+    op.drop_index('ix_usage_user_created', table_name='usage_records')
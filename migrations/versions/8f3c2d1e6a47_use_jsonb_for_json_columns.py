@@ -0,0 +1,48 @@
+"""use_jsonb_for_json_columns
+
+Revision ID: 8f3c2d1e6a47
+Revises: 59861715427e
+Create Date: 2026-10-16 09:40:07.562913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '8f3c2d1e6a47'
+down_revision = '59861715427e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # JSONB only exists on PostgreSQL; other backends keep generic JSON
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.alter_column('users', 'preferences',
+                    type_=postgresql.JSONB(),
+                    existing_type=sa.JSON(),
+                    postgresql_using='preferences::jsonb')
+    op.alter_column('usage_records', 'request_metadata',
+                    type_=postgresql.JSONB(),
+                    existing_type=sa.JSON(),
+                    postgresql_using='request_metadata::jsonb')
+    op.create_index('ix_usage_metadata_gin', 'usage_records', ['request_metadata'],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.drop_index('ix_usage_metadata_gin', table_name='usage_records')
+    op.alter_column('usage_records', 'request_metadata',
+                    type_=sa.JSON(),
+                    existing_type=postgresql.JSONB(),
+                    postgresql_using='request_metadata::json')
+    op.alter_column('users', 'preferences',
+                    type_=sa.JSON(),
+                    existing_type=postgresql.JSONB(),
+                    postgresql_using='preferences::json')
@@ -0,0 +1,53 @@
+"""store_costs_as_micro_usd
+
+Revision ID: b4e1f09a7c25
+Revises: 8f3c2d1e6a47
+Create Date: 2026-10-16 10:05:33.104872
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e1f09a7c25'
+down_revision = '8f3c2d1e6a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Add integer micro-USD columns next to the Numeric ones
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('total_cost_micro_usd', sa.BigInteger(), server_default='0', nullable=False))
+    
+    with op.batch_alter_table('usage_records') as batch_op:
+        batch_op.add_column(sa.Column('cost_micro_usd', sa.BigInteger(), server_default='0', nullable=False))
+    
+    # Carry existing costs over
+    op.execute("UPDATE users SET total_cost_micro_usd = CAST(ROUND(total_cost * 1000000) AS BIGINT)")
+    op.execute("UPDATE usage_records SET cost_micro_usd = CAST(ROUND(cost * 1000000) AS BIGINT)")
+    
+    # Drop the Numeric columns
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('total_cost')
+    
+    with op.batch_alter_table('usage_records') as batch_op:
+        batch_op.drop_column('cost')
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('total_cost', sa.Numeric(10, 2), server_default='0', nullable=False))
+    
+    with op.batch_alter_table('usage_records') as batch_op:
+        batch_op.add_column(sa.Column('cost', sa.Numeric(10, 4), server_default='0', nullable=False))
+    
+    op.execute("UPDATE users SET total_cost = total_cost_micro_usd / 1000000.0")
+    op.execute("UPDATE usage_records SET cost = cost_micro_usd / 1000000.0")
+    
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('total_cost_micro_usd')
+    
+    with op.batch_alter_table('usage_records') as batch_op:
+        batch_op.drop_column('cost_micro_usd')